@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Form, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Request,
+    Form,
+    Query,
+    UploadFile,
+    status,
+)
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
 from datetime import datetime
+from typing import Optional
+from urllib.parse import urlencode
 import json
 
-from . import models, auth
-from .roles import requires_permission
-from .auth import get_password_hash
-from .database import get_db
+from . import models, auth, exports, imports, metrics, pagination, stats
+from .roles import requires_permission, role_catalog
+from .auth import get_password_hash_async
+from .database import get_async_db, get_async_session_factory
 
 
 router = APIRouter(
@@ -26,17 +40,24 @@ def get_templates(request: Request):
 @requires_permission("view_system")
 async def admin_dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """Admin dashboard showing system statistics and management options."""
-    # Get user count
-    user_count = db.query(models.User).count()
+    # Maintained counters instead of counting rows on every load
+    counts = await db.run_sync(stats.read)
+    role_counts = {
+        name.removeprefix("users.role."): value
+        for name, value in sorted(counts.items())
+        if name.startswith("users.role.") and value
+    }
 
     # Get recent users
     recent_users = (
-        db.query(models.User).order_by(models.User.created_at.desc()).limit(5).all()
-    )
+        await db.scalars(
+            select(models.User).order_by(models.User.created_at.desc()).limit(5)
+        )
+    ).all()
 
     templates = get_templates(request)
     return templates.TemplateResponse(
@@ -45,21 +66,94 @@ async def admin_dashboard(
             "request": request,
             "current_user": current_user,
             "user": current_user,  # Add this for the base template
-            "user_count": user_count,
+            "user_count": counts.get("users.total", 0),
+            "active_user_count": counts.get("users.active", 0),
+            "inactive_user_count": counts.get("users.inactive", 0),
+            "role_counts": role_counts,
+            "open_todo_count": counts.get("todos.open", 0),
+            "completed_todo_count": counts.get("todos.completed", 0),
             "recent_users": recent_users,
         },
     )
 
 
+@router.get("/metrics")
+@requires_permission("view_system")
+async def system_metrics(
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Return in-process metrics for this worker."""
+    return metrics.snapshot()
+
+
+# Sortable columns of the user list; each key is covered by an index
+USER_SORT_KEYS = {
+    "id": (models.User.id,),
+    "email": (models.User.email,),
+    "created_at": (models.User.created_at, models.User.id),
+}
+
+
+def prefix_match(column, prefix: str):
+    """Match values starting with ``prefix``, ignoring case.
+
+    Compares ``lower(column)`` as a range, so it is served by the
+    ``lower()`` expression indexes on users, unlike LIKE.
+    """
+    prefix = func.lower(prefix)
+    return and_(func.lower(column) >= prefix, func.lower(column) < prefix + "\U0010ffff")
+
+
+async def get_user_rows(
+    request: Request,
+    db: AsyncSession,
+    q: Optional[str],
+    sort: str,
+    order: str,
+    limit: int,
+    after: Optional[str] = None,
+) -> dict:
+    """Load one page of the user list plus the URL of the next page."""
+    stmt = select(models.User)
+    if q:
+        stmt = stmt.where(
+            or_(prefix_match(models.User.email, q), prefix_match(models.User.name, q))
+        )
+    page = await pagination.paginate(
+        db,
+        stmt,
+        USER_SORT_KEYS[sort],
+        limit=limit,
+        after=after,
+        descending=order == "desc",
+    )
+
+    next_url = None
+    if page.next_cursor:
+        params = {"sort": sort, "order": order, "limit": limit}
+        if q:
+            params["q"] = q
+        params["after"] = page.next_cursor
+        next_url = f"{request.url_for('list_user_rows').path}?{urlencode(params)}"
+    return {"users": page.items, "next_url": next_url}
+
+
 @router.get("/users", response_class=HTMLResponse)
 @requires_permission("view_users")
 async def list_users(
     request: Request,
-    db: Session = Depends(get_db),
+    q: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|email|created_at)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
-    """List all users in the system."""
-    users = db.query(models.User).all()
+    """List users with search and sorting; further pages load on scroll."""
+    rows = await get_user_rows(request, db, q, sort, order, limit)
     templates = get_templates(request)
     return templates.TemplateResponse(
         "admin/users.html",
@@ -67,20 +161,85 @@ async def list_users(
             "request": request,
             "current_user": current_user,
             "user": current_user,  # Add this for the base template
-            "users": users,
+            "q": q or "",
+            "sort": sort,
+            "order": order,
+            **rows,
         },
     )
 
 
+@router.get("/users/rows", response_class=HTMLResponse)
+@requires_permission("view_users")
+async def list_user_rows(
+    request: Request,
+    q: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|email|created_at)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Render one page of user table rows for HTMX."""
+    rows = await get_user_rows(request, db, q, sort, order, limit, after)
+    templates = get_templates(request)
+    return templates.TemplateResponse(
+        "admin/user_rows.html",
+        {"request": request, "current_user": current_user, **rows},
+    )
+
+
+@router.get("/users/export")
+@requires_permission("view_users")
+async def export_users(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Stream all users (without password hashes) as CSV or NDJSON."""
+    stmt = select(
+        models.User.id,
+        models.User.email,
+        models.User.name,
+        models.User.role,
+        models.User.is_active,
+        models.User.created_at,
+        models.User.last_login,
+    ).order_by(models.User.id)
+    return exports.export_response(session_factory, stmt, "users", format)
+
+
+@router.get("/todos/export")
+@requires_permission("view_users")
+async def export_todos(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Stream all todos as CSV or NDJSON."""
+    stmt = select(
+        models.Todo.id,
+        models.Todo.user_id,
+        models.Todo.content,
+        models.Todo.completed,
+        models.Todo.created_at,
+    ).order_by(models.Todo.id)
+    return exports.export_response(session_factory, stmt, "todos", format)
+
+
 @router.get("/users/new", response_class=HTMLResponse)
 @requires_permission("manage_users")
 async def new_user_form(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """Show form to create a new user."""
-    roles = db.query(models.Role).all()
     templates = get_templates(request)
     return templates.TemplateResponse(
         "admin/user_form.html",
@@ -88,7 +247,7 @@ async def new_user_form(
             "request": request,
             "current_user": current_user,
             "user": None,
-            "roles": roles,
+            "roles": role_catalog.roles(),
             "is_new": True,
         },
     )
@@ -99,15 +258,14 @@ async def new_user_form(
 async def edit_user_form(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """Show form to edit a user."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    roles = db.query(models.Role).all()
     templates = get_templates(request)
     return templates.TemplateResponse(
         "admin/user_form.html",
@@ -115,7 +273,7 @@ async def edit_user_form(
             "request": request,
             "current_user": current_user,
             "user": user,
-            "roles": roles,
+            "roles": role_catalog.roles(),
             "is_new": False,
         },
     )
@@ -125,7 +283,7 @@ async def edit_user_form(
 @requires_permission("manage_users")
 async def create_user(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
     email: str = Form(...),
     password: str = Form(...),
@@ -135,25 +293,25 @@ async def create_user(
 ):
     """Create a new user."""
     # Check if email already exists
-    if db.query(models.User).filter(models.User.email == email).first():
+    if await db.scalar(select(models.User.id).where(models.User.email == email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Validate role exists
-    if not db.query(models.Role).filter(models.Role.name == role).first():
+    if not await db.scalar(select(models.Role.id).where(models.Role.name == role)):
         raise HTTPException(status_code=400, detail="Invalid role")
 
     # Create user
     user = models.User(
         email=email,
         name=name,
-        hashed_password=get_password_hash(password),
+        hashed_password=await get_password_hash_async(password),
         role=role,
         is_active=is_active,
         created_at=datetime.utcnow(),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    auth.invalidate_user(user_id=user.id, email=user.email)
 
     return RedirectResponse(
         url="/admin/users",
@@ -161,12 +319,25 @@ async def create_user(
     )
 
 
+@router.post("/users/import")
+@requires_permission("manage_users")
+async def import_users(
+    request: Request,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Create users in bulk from an uploaded CSV; returns a per-row error report."""
+    report = await imports.import_users(db, await file.read())
+    return {"created": report.created, "errors": report.errors}
+
+
 @router.put("/users/{user_id}")
 @requires_permission("manage_users")
 async def update_user(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
     email: str = Form(...),
     name: str = Form(None),
@@ -174,7 +345,7 @@ async def update_user(
     is_active: bool = Form(True),
 ):
     """Update a user's information."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -183,24 +354,27 @@ async def update_user(
         raise HTTPException(status_code=400, detail="Cannot modify your own account")
 
     # Check if email is taken by another user
-    existing_user = (
-        db.query(models.User)
-        .filter(models.User.email == email, models.User.id != user_id)
-        .first()
+    existing_user = await db.scalar(
+        select(models.User.id).where(
+            models.User.email == email, models.User.id != user_id
+        )
     )
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already taken")
 
     # Validate role exists
-    if not db.query(models.Role).filter(models.Role.name == role).first():
+    if not await db.scalar(select(models.Role.id).where(models.Role.name == role)):
         raise HTTPException(status_code=400, detail="Invalid role")
 
     # Update user
+    previous_email = user.email
     user.email = email
     user.name = name
     user.role = role
     user.is_active = is_active
-    db.commit()
+    await db.commit()
+    auth.invalidate_user(user_id=user.id, email=previous_email)
+    auth.invalidate_user(email=email)
 
     return RedirectResponse(
         url="/admin/users",
@@ -213,11 +387,11 @@ async def update_user(
 async def reset_user_password(
     request: Request,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """Reset a user's password to a random string."""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -236,8 +410,9 @@ async def reset_user_password(
     password = "".join(secrets.choice(alphabet) for _ in range(12))
 
     # Update password
-    user.hashed_password = get_password_hash(password)
-    db.commit()
+    user.hashed_password = await get_password_hash_async(password)
+    await db.commit()
+    auth.invalidate_user(user_id=user.id, email=user.email)
 
     return {"success": True, "password": password}
 
@@ -246,11 +421,13 @@ async def reset_user_password(
 @requires_permission("view_roles")
 async def list_roles(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """List all roles."""
-    roles = db.query(models.Role).all()
+    roles = (
+        await db.scalars(select(models.Role).options(selectinload(models.Role.users)))
+    ).all()
     templates = get_templates(request)
     return templates.TemplateResponse(
         "admin/roles.html",
@@ -267,7 +444,7 @@ async def list_roles(
 @requires_permission("manage_roles")
 async def create_role(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
     name: str = Form(...),
     description: str = Form(None),
@@ -275,7 +452,7 @@ async def create_role(
 ):
     """Create a new role."""
     # Validate name is unique
-    if db.query(models.Role).filter(models.Role.name == name).first():
+    if await db.scalar(select(models.Role.id).where(models.Role.name == name)):
         raise HTTPException(status_code=400, detail="Role name already exists")
 
     # Validate permissions JSON
@@ -291,7 +468,8 @@ async def create_role(
         created_at=datetime.utcnow(),
     )
     db.add(role)
-    db.commit()
+    await db.commit()
+    await db.run_sync(role_catalog.load)
 
     return RedirectResponse(
         url="/admin/roles",
@@ -304,22 +482,20 @@ async def create_role(
 async def update_role(
     request: Request,
     role_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
     name: str = Form(...),
     description: str = Form(None),
     permissions: str = Form("{}"),
 ):
     """Update a role."""
-    role = db.query(models.Role).filter(models.Role.id == role_id).first()
+    role = await db.get(models.Role, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
 
     # Check if new name is taken by another role
-    existing_role = (
-        db.query(models.Role)
-        .filter(models.Role.name == name, models.Role.id != role_id)
-        .first()
+    existing_role = await db.scalar(
+        select(models.Role.id).where(models.Role.name == name, models.Role.id != role_id)
     )
     if existing_role:
         raise HTTPException(status_code=400, detail="Role name already taken")
@@ -330,10 +506,19 @@ async def update_role(
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid permissions format")
 
+    # users.role references the name, so don't rename roles that are in use
+    if name != role.name and await db.scalar(
+        select(models.User.id).where(models.User.role == role.name)
+    ):
+        raise HTTPException(
+            status_code=400, detail="Cannot rename role that is assigned to users"
+        )
+
     role.name = name
     role.description = description
     role.permissions = permissions
-    db.commit()
+    await db.commit()
+    await db.run_sync(role_catalog.load)
 
     return RedirectResponse(
         url="/admin/roles",
@@ -346,21 +531,22 @@ async def update_role(
 async def delete_role(
     request: Request,
     role_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """Delete a role."""
-    role = db.query(models.Role).filter(models.Role.id == role_id).first()
+    role = await db.get(models.Role, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
 
     # Don't allow deleting roles that are in use
-    if db.query(models.User).filter(models.User.role == role.name).first():
+    if await db.scalar(select(models.User.id).where(models.User.role == role.name)):
         raise HTTPException(
             status_code=400, detail="Cannot delete role that is assigned to users"
         )
 
-    db.delete(role)
-    db.commit()
+    await db.delete(role)
+    await db.commit()
+    await db.run_sync(role_catalog.load)
 
     return {"success": True}
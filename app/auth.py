@@ -1,12 +1,15 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import FrozenSet, Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from . import models, database
+from . import models, database, hashing, cache, roles
 
 # JWT configuration
 import os
@@ -20,8 +23,30 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev_secret_key_change_in_production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified token cache: repeat requests with the same token skip signature
+# verification. Entries never outlive the token's own expiry.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+JWT_CACHE_TTL = int(os.getenv("JWT_CACHE_TTL", "300"))
+token_cache = cache.TTLCache("jwt_cache", JWT_CACHE_SIZE, JWT_CACHE_TTL)
+
+# Per-worker cache of user snapshots, keyed by ("email", ...) and ("id", ...).
+# Writes in this worker invalidate entries explicitly; the TTL bounds how long
+# other workers may serve a stale entry.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+user_cache = cache.TTLCache("user_cache", USER_CACHE_SIZE, USER_CACHE_TTL)
+
+# passlib/bcrypt and python-jose (with its cryptography backend) are imported
+# on first use rather than at startup; see scripts/startup_budget.py
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Return the password hashing context, creating it on first use."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -29,12 +54,22 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password, hashed_password):
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
     """Hash a password for storing."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """Verify a password against a hash without blocking the event loop."""
+    return await hashing.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password):
+    """Hash a password for storing without blocking the event loop."""
+    return await hashing.run(get_password_hash, password)
 
 
 def authenticate_user(db: Session, email: str, password: str):
@@ -49,8 +84,22 @@ def authenticate_user(db: Session, email: str, password: str):
     return user
 
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    """Authenticate a user by email and password, verifying in the hashing pool."""
+    user = await db.scalar(select(models.User).where(models.User.email == email))
+    if not user:
+        return False
+    if not await verify_password_async(password, user.hashed_password):
+        return False
+    if not user.is_active:
+        return False
+    return user
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -61,6 +110,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing previously verified claims.
+
+    Raises JWTError if the token is invalid or expired.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    from jose import jwt
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_cache.set(token, payload, ttl)
+    return payload
+
+
 async def get_token_from_cookie(request: Request):
     """Extract token from cookie."""
     token = request.cookies.get("access_token")
@@ -72,85 +139,179 @@ async def get_token_from_cookie(request: Request):
     return token
 
 
-def get_optional_current_user_sync(token: str, db: Session):
-    """Synchronous version of get_optional_current_user."""
-    if not token:
+def get_user_by_email(db: Session, email: str):
+    """Load a user by email."""
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of the user fields needed to authorize a request."""
+
+    id: int
+    email: str
+    name: Optional[str]
+    role: str
+    is_active: bool
+    created_at: datetime
+    last_login: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            last_login=user.last_login,
+        )
+
+
+def get_user_snapshot(db: Session, email: str) -> Optional[UserSnapshot]:
+    """Return a snapshot of the user with ``email``, served from the user cache."""
+    snapshot = user_cache.get(("email", email))
+    if snapshot is not None:
+        return snapshot
+
+    user = get_user_by_email(db, email)
+    if user is None:
         return None
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.set(("email", snapshot.email), snapshot)
+    user_cache.set(("id", snapshot.id), snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+    """Drop a user's cached snapshot; call after committing changes to the user."""
+    if user_id is not None:
+        cached = user_cache.pop(("id", user_id))
+        if cached is not None:
+            user_cache.pop(("email", cached.email))
+    if email is not None:
+        user_cache.pop(("email", email))
+
+
+def invalidate_all_users() -> None:
+    """Drop every cached user snapshot."""
+    user_cache.clear()
+
+
+def get_user_from_token(token: str, db: Session) -> Optional[UserSnapshot]:
+    """Return the user a token belongs to, or None if the token is not valid."""
+    from jose import JWTError
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        user = db.query(models.User).filter(models.User.email == email).first()
-        return user
+        payload = decode_access_token(token)
     except JWTError:
         return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+    return get_user_snapshot(db, email)
 
 
-async def get_optional_current_user(
-    request: Request = None, db: Session = Depends(database.get_db)
-):
-    """Get the current user from a JWT token in cookie, or None if not authenticated."""
-    if not request:
+@dataclass
+class Principal:
+    """The authenticated identity of a request."""
+
+    user: Optional[UserSnapshot] = None
+    role: Optional[str] = None
+    permissions: FrozenSet[str] = frozenset()
+
+
+def get_request_token(request: Request) -> Optional[str]:
+    """Return the bearer token from the Authorization header or the token cookie."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            return token
         return None
+    token = request.cookies.get("access_token")
+    if token and token.startswith("Bearer "):
+        token = token[7:]
+    return token or None
+
 
-    token = await get_token_from_cookie(request)
+def resolve_principal(request: Request, db: Session) -> Principal:
+    """Resolve the request's principal once and store it on ``request.state``.
+
+    The first call decodes the token, looks up the user snapshot (from the
+    user cache, or one user query) and takes the role's permissions from the
+    in-memory role catalog; later calls during the same request (middleware,
+    dependencies, handlers) reuse the stored result.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    principal = Principal()
+    token = get_request_token(request)
+    if token:
+        user = get_user_from_token(token, db)
+        if user is not None:
+            roles.role_catalog.ensure_fresh(db)
+            principal = Principal(
+                user=user,
+                role=user.role,
+                permissions=roles.role_catalog.permissions(user.role),
+            )
+    request.state.principal = principal
+    return principal
+
+
+async def resolve_principal_async(request: Request, db: AsyncSession) -> Principal:
+    """Async version of resolve_principal for handlers using an AsyncSession."""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    return await db.run_sync(lambda session: resolve_principal(request, session))
+
+
+def get_optional_current_user_sync(token: str, db: Session):
+    """Synchronous version of get_optional_current_user."""
     if not token:
         return None
+    return get_user_from_token(token, db)
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        user = db.query(models.User).filter(models.User.email == email).first()
-        return user
-    except JWTError:
+
+async def get_optional_current_user(
+    request: Request = None, db: AsyncSession = Depends(database.get_async_db)
+):
+    """Get the current user from a JWT token in cookie, or None if not authenticated."""
+    if not request:
         return None
+    return (await resolve_principal_async(request, db)).user
 
 
 def get_current_user_sync(token: str, db: Session):
     """Synchronous version of get_current_user."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        user = db.query(models.User).filter(models.User.email == email).first()
-        if user is None:
-            raise credentials_exception
-        return user
-    except JWTError:
-        raise credentials_exception
+    user = get_user_from_token(token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    """Get the current user from a JWT token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == email).first()
+    """Get the current user from the request's principal."""
+    user = (await resolve_principal_async(request, db)).user
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
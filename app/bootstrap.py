@@ -0,0 +1,100 @@
+"""One-time database bootstrap: dashboard counters, default admin and roles.
+
+Runs from the application's lifespan (not at import), and is meant to do
+its work once per deployment rather than once per worker:
+
+* ``is_bootstrapped`` is a few indexed reads; once it passes, every later
+  worker start skips the bootstrap entirely (no writes, no bcrypt hash).
+* The first workers to start race for an exclusive lock on
+  ``BOOTSTRAP_LOCK_FILE``; the winner bootstraps and the others re-check
+  once it releases the lock. The database's unique constraints still
+  guard deployments whose workers do not share a filesystem.
+
+``scripts/bootstrap_db.py`` runs the same step ahead of starting the
+server, e.g. in the container entrypoint after migrations; the lifespan
+check then only costs the reads (or set ``BOOTSTRAP_ON_STARTUP=false``).
+"""
+import logging
+import os
+from contextlib import contextmanager
+from typing import Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import auth, database, models, roles, stats
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Set to false when the bootstrap runs as a separate deployment step
+BOOTSTRAP_ON_STARTUP = os.getenv("BOOTSTRAP_ON_STARTUP", "true").lower() == "true"
+
+BOOTSTRAP_LOCK_FILE = os.getenv("BOOTSTRAP_LOCK_FILE") or os.path.join(
+    database.data_dir, ".bootstrap.lock"
+)
+
+
+def is_bootstrapped(db: Session) -> bool:
+    """Whether the counters, an admin user and every default role exist."""
+    if not db.scalar(select(func.count()).select_from(models.Stat)):
+        return False
+    admin = db.scalar(select(models.User.id).where(models.User.role == "admin").limit(1))
+    if admin is None:
+        return False
+    existing = set(db.scalars(select(models.Role.name)))
+    return existing >= set(roles.DEFAULT_ROLES)
+
+
+def bootstrap(db: Session) -> None:
+    """Create whatever part of the initial data is missing."""
+    # Seed the dashboard counters on first start, before any writes
+    stats.ensure_seeded(db)
+
+    # Create default roles if they don't exist (users.role references them)
+    roles.ensure_default_roles_exist(db)
+    logger.info("Default roles confirmed")
+
+    # Create admin user if it doesn't exist
+    admin = auth.ensure_admin_exists(db)
+    logger.info(f"Admin user confirmed: {admin.email}")
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on ``path`` (a no-op where flock is unavailable)."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run(
+    session_factory: Callable[[], Session] = database.SessionLocal,
+    lock_path: str = BOOTSTRAP_LOCK_FILE,
+) -> bool:
+    """Bootstrap the database unless it already is; returns whether it ran."""
+    with session_factory() as db:
+        if is_bootstrapped(db):
+            logger.info("Database already bootstrapped")
+            return False
+
+    with file_lock(lock_path):
+        with session_factory() as db:
+            # Another worker may have finished while we waited for the lock
+            if is_bootstrapped(db):
+                logger.info("Database already bootstrapped")
+                return False
+            logger.info("Bootstrapping database")
+            bootstrap(db)
+    return True
@@ -0,0 +1,119 @@
+"""ETags and conditional GETs for pages that only depend on cheap inputs.
+
+Pages such as ``/login`` render the same bytes for the same template set,
+theme and HTMX target. Their ETag is a hash of those inputs (plus the build
+version), so a matching ``If-None-Match`` is answered with 304 before the
+template is rendered:
+
+    etag = etags.page_etag(request, "login.html", current_theme)
+    if etags.matches(request, etag):
+        return etags.page_not_modified(etag)
+    return etags.apply(templates.TemplateResponse(...), etag)
+
+The build version is ``APP_BUILD_ID`` when set (e.g. the commit being
+deployed). Otherwise it is derived from the template files, the static
+manifest and the theme stylesheet URL. It is computed once when templates
+are not auto-reloaded and on every call when they are (development).
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Request, Response
+
+from . import static_assets, templating
+
+# Identifies the deployed code; overrides the computed build version
+APP_BUILD_ID = os.getenv("APP_BUILD_ID") or None
+
+# Revalidate on every use; cookies (the theme) make the pages per user
+PAGE_CACHE_CONTROL = "private, no-cache"
+
+# Suffixes CompressionMiddleware adds to the ETags of responses it encodes
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def make_etag(*parts: str) -> str:
+    """Return a strong ETag for the given version key parts."""
+    digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _scan_templates() -> str:
+    digest = hashlib.sha256()
+    for path in sorted(templating.TEMPLATE_DIR.rglob("*")):
+        if path.is_file():
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+_cached_scan = lru_cache(maxsize=1)(_scan_templates)
+
+
+def build_version() -> str:
+    """Version of everything a rendered page depends on besides its context."""
+    if APP_BUILD_ID:
+        return APP_BUILD_ID
+    env = templating.templates.env
+    scan = _scan_templates() if env.auto_reload else _cached_scan()
+    return make_etag(
+        scan,
+        json.dumps(static_assets.load_manifest(), sort_keys=True),
+        ",".join(sorted(static_assets.built_outputs())),
+        str(env.globals.get("theme_stylesheet_url")),
+    )
+
+
+def page_etag(request: Request, template_name: str, *keys: str) -> str:
+    """ETag for ``template_name`` rendered with a context determined by ``keys``.
+
+    The HTMX partial block the request would get is part of the key.
+    """
+    block = templating.get_partial_block(request) or ""
+    return make_etag(build_version(), template_name, block, *keys)
+
+
+def matches(request: Request, etag: str) -> bool:
+    """Whether the request's ``If-None-Match`` covers ``etag``.
+
+    Uses the weak comparison RFC 9110 requires for ``If-None-Match`` and
+    ignores the encoding suffix added by ``CompressionMiddleware``.
+    """
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag = tag.removeprefix("W/")
+        for suffix in ENCODING_SUFFIXES:
+            if tag.endswith(f'{suffix}"'):
+                tag = tag[: -len(suffix) - 1] + '"'
+                break
+        if tag == etag:
+            return True
+    return False
+
+
+def apply(response: Response, etag: str, cache_control: str = PAGE_CACHE_CONTROL) -> Response:
+    """Set the validator headers on a full response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(etag: str, cache_control: str = PAGE_CACHE_CONTROL) -> Response:
+    """A 304 response for a request whose cached copy is still current."""
+    return apply(Response(status_code=304), etag, cache_control)
+
+
+def page_not_modified(etag: str) -> Response:
+    """A 304 for a page, with the ``Vary`` headers of the full response."""
+    response = not_modified(etag)
+    for header in templating.PARTIAL_VARY:
+        response.headers.add_vary_header(header)
+    return response
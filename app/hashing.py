@@ -0,0 +1,149 @@
+"""Bounded worker pool for password hashing.
+
+bcrypt deliberately takes a few hundred milliseconds per call. Running it
+inside an ``async def`` route blocks the event loop for every other request
+on the worker, so hashing and verification are handed to a small dedicated
+thread pool instead (bcrypt releases the GIL while it works). The number of
+in-flight jobs is capped so a login burst fails fast with a 503 instead of
+queueing without bound.
+
+Bulk jobs (user imports) hash whole batches of passwords at once; those go
+to a separate process pool so a large import uses every core without
+competing with the login pool.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+from . import metrics
+
+# Number of threads doing bcrypt work
+HASH_POOL_SIZE = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+# Maximum number of jobs running or waiting in the pool
+HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+# Number of processes hashing passwords for bulk jobs
+BULK_HASH_WORKERS = int(os.getenv("BULK_HASH_WORKERS", os.cpu_count() or 1))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_pending = 0
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the hashing executor, creating it on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=HASH_POOL_SIZE, thread_name_prefix="password-hash"
+            )
+        return _executor
+
+
+def pending_jobs() -> int:
+    """Number of hashing jobs currently running or queued."""
+    return _pending
+
+
+async def run(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a password hashing function in the hashing pool.
+
+    Raises a 503 HTTPException when the pool already holds
+    ``HASH_QUEUE_LIMIT`` jobs.
+    """
+    global _pending
+    executor = get_executor()
+    with _lock:
+        if _pending >= HASH_QUEUE_LIMIT:
+            metrics.increment("password_hash.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+
+    queued_at = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        metrics.observe("password_hash.wait", started - queued_at)
+        try:
+            return func(*args)
+        finally:
+            metrics.observe("password_hash.run", time.perf_counter() - started)
+
+    try:
+        future = executor.submit(job)
+    except BaseException:
+        _release()
+        raise
+    # Free the slot when the job is done (or cancelled before it started),
+    # not when the awaiting request goes away while bcrypt is still running
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+def _release(future=None) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the bulk hashing process pool, creating it on first use."""
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            # Spawned, not forked: the parent runs an event loop and threads
+            _process_pool = ProcessPoolExecutor(
+                max_workers=BULK_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+# Hashing contexts built in each pool process, keyed by their configuration
+_contexts: Dict[str, Any] = {}
+
+
+def _hash_chunk(config: str, passwords: Sequence[str]) -> List[str]:
+    """Hash passwords with the CryptContext described by ``config``."""
+    context = _contexts.get(config)
+    if context is None:
+        from passlib.context import CryptContext
+
+        context = _contexts[config] = CryptContext.from_string(config)
+    return [context.hash(password) for password in passwords]
+
+
+async def hash_many(context, passwords: Sequence[str]) -> List[str]:
+    """Hash ``passwords`` with ``context``'s policy across the process pool.
+
+    Returns the hashes in input order.
+    """
+    if not passwords:
+        return []
+    config = context.to_string()
+    size = -(-len(passwords) // BULK_HASH_WORKERS)  # one chunk per process
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+
+    started = time.perf_counter()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _hash_chunk, config, passwords[i : i + size])
+            for i in range(0, len(passwords), size)
+        )
+    )
+    metrics.observe("password_hash.bulk", time.perf_counter() - started)
+    metrics.increment("password_hash.bulk_hashed", len(passwords))
+    return [hashed for chunk in chunks for hashed in chunk]
@@ -0,0 +1,188 @@
+"""Bulk user import from CSV.
+
+The whole upload is decoded and validated in a worker thread first, so a
+file that is not UTF-8 is rejected before anything is written. Valid rows
+are then handled in batches of ``IMPORT_BATCH_SIZE``. Each batch costs one
+set-based duplicate check, one parallel hashing job and one multi-row
+INSERT, and is committed as its own transaction. Rows that cannot be
+imported are reported with their CSV line number.
+
+Expected columns: ``email`` and ``password`` (required), ``name``, ``role``
+(default ``user``) and ``is_active`` (default true).
+"""
+import csv
+import io
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from . import auth, database, hashing, models, schemas, stats
+from .roles import role_catalog
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+REQUIRED_COLUMNS = {"email", "password"}
+TRUE_VALUES = {"", "1", "true", "yes", "y", "on"}
+FALSE_VALUES = {"0", "false", "no", "n", "off"}
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import: how many users were created and which rows failed."""
+
+    created: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, email: str, error: str) -> None:
+        self.errors.append({"line": line, "email": email, "error": error})
+
+
+def parse_row(row: dict) -> dict:
+    """Validate one CSV row and return the user fields, or raise ValueError."""
+    email = (row.get("email") or "").strip()
+    password = row.get("password") or ""
+    try:
+        user = schemas.UserCreate(email=email, password=password)
+    except ValidationError as e:
+        error = e.errors()[0]
+        raise ValueError(f"Invalid {error['loc'][0]}: {error['msg']}")
+
+    role = (row.get("role") or "").strip() or "user"
+    if role not in role_catalog:
+        raise ValueError(f"Invalid role: {role}")
+
+    is_active = (row.get("is_active") or "").strip().lower()
+    if is_active not in TRUE_VALUES | FALSE_VALUES:
+        raise ValueError(f"Invalid is_active: {is_active}")
+
+    return {
+        "email": user.email,
+        "password": user.password,
+        "name": (row.get("name") or "").strip() or None,
+        "role": role,
+        "is_active": is_active in TRUE_VALUES,
+    }
+
+
+def parse_csv(data: bytes) -> Tuple[List[Tuple[int, dict]], ImportReport]:
+    """Decode and validate a CSV upload.
+
+    Returns the valid ``(line, user)`` rows and a report holding the
+    rejected ones.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8 encoded"
+        )
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV is missing columns: {', '.join(sorted(missing))}",
+        )
+
+    report = ImportReport()
+    seen = set()
+    rows: List[Tuple[int, dict]] = []
+    for row in reader:
+        line = reader.line_num
+        try:
+            user = parse_row(row)
+        except ValueError as e:
+            report.add_error(line, row.get("email") or "", str(e))
+            continue
+        if user["email"] in seen:
+            report.add_error(line, user["email"], "Duplicate email in file")
+            continue
+        seen.add(user["email"])
+        rows.append((line, user))
+    return rows, report
+
+
+async def import_users(db: AsyncSession, data: bytes) -> ImportReport:
+    """Create users from an uploaded CSV file, committing once per batch."""
+    # Parsing and validation are CPU-bound; keep them off the event loop
+    rows, report = await run_in_threadpool(parse_csv, data)
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        await _import_batch(db, rows[start : start + IMPORT_BATCH_SIZE], report)
+
+    report.errors.sort(key=lambda error: error["line"])
+    return report
+
+
+async def _import_batch(
+    db: AsyncSession, batch: List[Tuple[int, dict]], report: ImportReport
+) -> None:
+    emails = [user["email"] for _, user in batch]
+    existing = set(
+        await db.scalars(select(models.User.email).where(models.User.email.in_(emails)))
+    )
+    for line, user in batch:
+        if user["email"] in existing:
+            report.add_error(line, user["email"], "Email already registered")
+    batch = [(line, user) for line, user in batch if user["email"] not in existing]
+    if not batch:
+        return
+
+    hashes = await hashing.hash_many(
+        auth.get_pwd_context(), [user["password"] for _, user in batch]
+    )
+    now = datetime.utcnow()
+    rows = [
+        {
+            "email": user["email"],
+            "name": user["name"],
+            "hashed_password": hashed,
+            "role": user["role"],
+            "is_active": user["is_active"],
+            "created_at": now,
+        }
+        for (_, user), hashed in zip(batch, hashes)
+    ]
+
+    # Emails registered since the duplicate check are skipped, not fatal
+    upsert = database.UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert is None:
+        inserted = await _insert_each(db, rows)
+    else:
+        stmt = (
+            upsert(models.User)
+            .on_conflict_do_nothing(index_elements=[models.User.email])
+            .returning(models.User.email)
+        )
+        inserted = set(await db.scalars(stmt, rows))
+
+    deltas = Counter()
+    for line, user in batch:
+        if user["email"] in inserted:
+            deltas.update(stats.user_counters(user["is_active"], user["role"]))
+        else:
+            report.add_error(line, user["email"], "Email already registered")
+    await db.run_sync(lambda session: stats.bump(session.connection(), deltas))
+    await db.commit()
+    report.created += len(inserted)
+
+
+async def _insert_each(db: AsyncSession, rows: List[dict]) -> set:
+    """Portable fallback: insert rows one at a time, skipping taken emails."""
+    inserted = set()
+    for row in rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(models.User).values(**row))
+        except IntegrityError:
+            continue
+        inserted.add(row["email"])
+    return inserted
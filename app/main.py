@@ -1,28 +1,50 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, HTTPException, Request, Form
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from . import (
     models,
     database,
+    etags,
     themes,
     auth,
     auth_routes,
     admin_routes,
     todo_routes,
-    roles,
-    jinja_filters,
+    bootstrap,
+    static_assets,
+    templating,
 )
+from .middleware import AuthCookieMiddleware, CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare the database and templates before the first request."""
+    database.log_sqlite_settings(database.engine)
+    # Database should be created by alembic migrations; this only seeds it
+    if bootstrap.BOOTSTRAP_ON_STARTUP:
+        await run_in_threadpool(bootstrap.run)
+
+    static_assets.check_build_outputs()
 
-app = FastAPI(title="FastAPI HTMX Starter")
-templates = Jinja2Templates(directory="app/templates")
+    # Compile templates before the first request (on by default in production)
+    if templating.warm_up_enabled():
+        templating.warm_up(templates)
+    yield
+    # Close pooled connections (and aiosqlite's worker threads) on shutdown
+    await database.async_engine.dispose()
 
-# Register custom Jinja2 filters
-jinja_filters.register_filters(templates)
+
+app = FastAPI(title="FastAPI HTMX Starter", lifespan=lifespan)
+# One shared Jinja2 environment for every router
+templates = templating.templates
+app.state.templates = templates
 
 # Add CORS middleware
 app.add_middleware(
@@ -33,90 +55,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Copy the token cookie into the Authorization header and protect the docs
+app.add_middleware(AuthCookieMiddleware)
 
-# Add middleware to protect documentation routes
-@app.middleware("http")
-async def protect_docs_routes(request: Request, call_next):
-    # List of protected routes
-    protected_routes = ["/docs", "/redoc", "/openapi.json"]
-
-    # Check if the request path is for a protected route
-    if request.url.path in protected_routes:
-        # Extract token from cookie
-        token = request.cookies.get("access_token")
-
-        if not token:
-            # No token, return 403 Forbidden
-            from fastapi.responses import JSONResponse
-
-            return JSONResponse(
-                status_code=403,
-                content={"detail": "Not authorized. Admin role required."},
-            )
-
-        # Verify token and check if user has admin role
-        try:
-            # Create a database session
-            db = database.SessionLocal()
-            try:
-                # Get user from token
-                user = auth.get_optional_current_user_sync(token, db)
-
-                # Check if user exists and has admin role
-                if not user or user.role != "admin":
-                    # User doesn't have admin role, return 403 Forbidden
-                    from fastapi.responses import JSONResponse
-
-                    return JSONResponse(
-                        status_code=403,
-                        content={"detail": "Not authorized. Admin role required."},
-                    )
-            finally:
-                # Close the database session
-                db.close()
-        except Exception as e:
-            # Error verifying token, return 403 Forbidden
-            from fastapi.responses import JSONResponse
-
-            return JSONResponse(
-                status_code=403,
-                content={"detail": "Not authorized. Admin role required."},
-            )
-
-    # Process the request and get the response
-    response = await call_next(request)
-    return response
-
-
-# Add middleware to extract token from cookies
-@app.middleware("http")
-async def cookie_to_authorization(request: Request, call_next):
-    # Extract token from cookie
-    token = request.cookies.get("access_token")
-
-    # Check if we have a token and no authorization header already exists
-    has_auth_header = False
-    for k, v in request.scope.get("headers", []):
-        if k.decode().lower() == "authorization":
-            has_auth_header = True
-            break
-
-    # Create a modified scope with the authorization header if token exists and no auth header
-    if token and not has_auth_header:
-        # Get the original headers as a list of tuples
-        headers = list(request.scope.get("headers", []))
-
-        # Add the authorization header
-        auth_value = f"Bearer {token}"
-        headers.append((b"authorization", auth_value.encode()))
-
-        # Update the scope headers
-        request.scope["headers"] = headers
-
-    # Process the request and get the response
-    response = await call_next(request)
-    return response
-
+# Compress text responses (outermost, so it sees every response)
+app.add_middleware(CompressionMiddleware)
 
 # Include auth routes
 app.include_router(auth_routes.router)
@@ -127,11 +70,15 @@ app.include_router(admin_routes.router)
 # Include todo routes
 app.include_router(todo_routes.router)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Mount static files (precompressed variants, immutable caching for hashed names)
+app.mount("/static", static_assets.StaticAssets(directory="app/static"), name="static")
 
 # Default theme
-DEFAULT_THEME = "gruvbox-dark"
+DEFAULT_THEME = themes.DEFAULT_THEME
+
+# Theme colors compiled once into a stylesheet under a content-hashed URL
+theme_stylesheet = themes.build_stylesheet()
+templates.env.globals["theme_stylesheet_url"] = f"/themes/{theme_stylesheet.digest}.css"
 
 
 def get_current_theme(request: Request) -> tuple[themes.ThemeColors, str]:
@@ -169,53 +116,20 @@ class ThemeColors(BaseModel):
     error: str
 
 
-# Create tables if they don't exist
-from sqlalchemy import inspect
-
-# Check if tables exist before creating them
-inspector = inspect(database.engine)
-existing_tables = inspector.get_table_names()
-
-# Database should be created by alembic migrations
-# Initialize database with admin user and default roles
-print("Initializing database...")
-with database.SessionLocal() as db:
-    try:
-        # Create admin user if it doesn't exist
-        admin = auth.ensure_admin_exists(db)
-        print(f"Admin user confirmed: {admin.email}")
-
-        # Create default roles if they don't exist
-        roles.ensure_default_roles_exist(db)
-        print("Default roles confirmed")
-    except Exception as e:
-        print(f"Error initializing database: {e}")
-        raise
-
-
 @app.get("/")
 def home(request: Request, db: Session = Depends(database.get_db)):
-    # Get current user from token cookie if available
-    access_token = request.cookies.get("access_token")
-    current_user = None
+    # Get current user from the request's principal if available
+    current_user = auth.resolve_principal(request, db).user
     todos = []
 
-    if access_token:
-        # Token is stored without Bearer prefix
-        try:
-            current_user = auth.get_optional_current_user_sync(access_token, db)
-            if current_user:
-                # Get user's todos if authenticated
-                todos = (
-                    db.query(models.Todo)
-                    .filter(models.Todo.user_id == current_user.id)
-                    .order_by(models.Todo.created_at.desc())
-                    .all()
-                )
-        except Exception as e:
-            # Invalid token, ignore and proceed as anonymous user
-            print(f"Authentication error: {e}")
-            pass
+    if current_user:
+        # Get user's todos if authenticated
+        todos = (
+            db.query(models.Todo)
+            .filter(models.Todo.user_id == current_user.id)
+            .order_by(models.Todo.created_at.desc())
+            .all()
+        )
 
     theme, current_theme = get_current_theme(request)
     response = templates.TemplateResponse(
@@ -242,6 +156,13 @@ def home(request: Request, db: Session = Depends(database.get_db)):
 @app.get("/settings")
 def settings_page(request: Request):
     theme, current_theme = get_current_theme(request)
+    # Answer revalidations before building the context or rendering
+    etag = etags.page_etag(request, "settings.html", current_theme)
+    if etags.matches(request, etag):
+        response = etags.page_not_modified(etag)
+        set_theme_cookie(response, current_theme)
+        return response
+
     # Create a dict of theme names and their colors
     theme_previews = {name: colors for name, colors in themes.THEMES.items()}
     # Sort themes alphabetically for consistent display
@@ -256,6 +177,7 @@ def settings_page(request: Request):
             "theme": theme,
         },
     )
+    etags.apply(response, etag)
     set_theme_cookie(response, current_theme)
     return response
 
@@ -272,10 +194,27 @@ def update_theme(request: Request, theme_name: str = Form(...)):
     return response
 
 
+@app.get("/themes/{digest}.css", include_in_schema=False)
+def get_theme_stylesheet(digest: str):
+    # The URL changes with the content, so it can be cached forever
+    if digest != theme_stylesheet.digest:
+        raise HTTPException(status_code=404, detail="Stylesheet not found")
+    return Response(
+        theme_stylesheet.css,
+        media_type="text/css",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 # JSON API endpoints
 @app.get("/api/theme/{theme_name}", response_model=ThemeColors)
-def get_theme_colors(theme_name: str):
+def get_theme_colors(theme_name: str, request: Request, response: Response):
     theme = themes.get_theme(theme_name)
     if not theme:
         raise HTTPException(status_code=404, detail=f"Theme '{theme_name}' not found")
+    # The stylesheet digest changes whenever any theme's colors do
+    etag = etags.make_etag("theme", theme_name, theme_stylesheet.digest)
+    if etags.matches(request, etag):
+        return etags.not_modified(etag, cache_control="no-cache")
+    etags.apply(response, etag, cache_control="no-cache")
     return theme
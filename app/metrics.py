@@ -0,0 +1,66 @@
+"""Lightweight in-process metrics for the application.
+
+Counters and timers are kept per worker process and exposed as a plain
+dictionary via ``snapshot()`` (served at ``/admin/metrics``).
+"""
+import threading
+from typing import Any, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+_timers: Dict[str, Dict[str, float]] = {}
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Increment a counter by ``value``."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record a duration (in seconds) for a timer."""
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = {"count": 0, "total": 0.0, "max": 0.0}
+        timer["count"] += 1
+        timer["total"] += seconds
+        if seconds > timer["max"]:
+            timer["max"] = seconds
+
+
+def snapshot() -> Dict[str, Any]:
+    """Return a copy of all counters and timer summaries (durations in milliseconds).
+
+    Every ``<name>.hits`` / ``<name>.misses`` counter pair is also reported
+    as a ``<name>.hit_rate`` ratio, and every ``<name>.bytes_in`` /
+    ``<name>.bytes_out`` pair as a ``<name>.ratio`` (output size over input).
+    """
+    with _lock:
+        ratios = {}
+        for name in _counters:
+            prefix, _, suffix = name.rpartition(".")
+            if suffix in ("hits", "misses"):
+                hits = _counters.get(f"{prefix}.hits", 0)
+                total = hits + _counters.get(f"{prefix}.misses", 0)
+                ratios[f"{prefix}.hit_rate"] = round(hits / total, 4)
+            elif suffix == "bytes_in" and _counters[name]:
+                bytes_out = _counters.get(f"{prefix}.bytes_out", 0)
+                ratios[f"{prefix}.ratio"] = round(bytes_out / _counters[name], 4)
+        timers = {
+            name: {
+                "count": timer["count"],
+                "total_ms": round(timer["total"] * 1000, 3),
+                "avg_ms": round(timer["total"] * 1000 / timer["count"], 3),
+                "max_ms": round(timer["max"] * 1000, 3),
+            }
+            for name, timer in _timers.items()
+        }
+        return {"counters": dict(_counters), "timers": timers, "ratios": ratios}
+
+
+def reset() -> None:
+    """Clear all recorded metrics."""
+    with _lock:
+        _counters.clear()
+        _timers.clear()
@@ -0,0 +1,263 @@
+"""Pure ASGI middleware.
+
+These work directly on the raw ASGI ``scope`` instead of going through
+Starlette's ``BaseHTTPMiddleware``, which wraps every response in an extra
+task and memory stream. Response messages are passed straight through, so
+streaming responses are never buffered.
+"""
+import os
+import time
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import auth, database, metrics
+from .static_assets import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Documentation routes that require an admin
+PROTECTED_DOCS_ROUTES = frozenset({"/docs", "/redoc", "/openapi.json"})
+
+TOKEN_COOKIE = b"access_token"
+
+# Responses smaller than this are sent uncompressed (most HTMX fragments)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Brotli's higher qualities cost far more CPU than they save on dynamic pages
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/javascript",
+        "application/json",
+        "application/x-ndjson",
+        "application/xml",
+        "image/svg+xml",
+    }
+)
+
+
+def get_cookie(cookie_header: bytes, name: bytes) -> Optional[bytes]:
+    """Return the value of cookie ``name`` from a raw Cookie header, if present."""
+    for chunk in cookie_header.split(b";"):
+        key, sep, value = chunk.strip().partition(b"=")
+        if sep and key == name:
+            return value.strip(b'"') or None
+    return None
+
+
+def _is_admin(request: Request) -> bool:
+    """Check whether the request's principal is an admin (runs blocking DB I/O).
+
+    The session comes from ``get_db``, or the app's override of it (as in
+    tests), so this reads the same database as the route handlers. Any
+    error while resolving the principal counts as not an admin.
+    """
+    get_db = request.app.dependency_overrides.get(database.get_db, database.get_db)
+    try:
+        sessions = get_db()
+        db = next(sessions)
+        try:
+            user = auth.resolve_principal(request, db).user
+            return bool(user and user.role == "admin")
+        finally:
+            sessions.close()
+    except Exception:
+        # Error verifying the token or reading the user; deny access
+        return False
+
+
+class AuthCookieMiddleware:
+    """Expose the ``access_token`` cookie as a bearer token and guard the docs.
+
+    If the request carries an ``access_token`` cookie but no Authorization
+    header, ``authorization: Bearer <token>`` is added to the scope so
+    OAuth2 dependencies can read it. Requests for the API documentation are
+    rejected with 403 unless the principal has the admin role.
+    """
+
+    def __init__(self, app: ASGIApp, protected_paths=PROTECTED_DOCS_ROUTES):
+        self.app = app
+        self.protected_paths = protected_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        token = None
+        has_auth_header = False
+        # ASGI header names are always lowercase bytes
+        for name, value in headers:
+            if name == b"authorization":
+                has_auth_header = True
+                break
+            if name == b"cookie" and token is None:
+                token = get_cookie(value, TOKEN_COOKIE)
+
+        if token and not has_auth_header:
+            scope = dict(scope)
+            scope["headers"] = [*headers, (b"authorization", b"Bearer " + token)]
+
+        if scope["path"] in self.protected_paths:
+            request = Request(scope)
+            if not (token or has_auth_header) or not await run_in_threadpool(
+                _is_admin, request
+            ):
+                response = JSONResponse(
+                    status_code=403,
+                    content={"detail": "Not authorized. Admin role required."},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Tag a strong ETag with the content coding, as it names exact bytes.
+
+    ``etags.matches`` strips the suffix again when revalidating.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class Compressor:
+    """Incremental brotli or gzip compressor for one response body."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(
+                COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+        self.cpu_time = 0.0
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress ``data``, flushing so the client can decode it right away."""
+        started = time.thread_time()
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            out += self._compressor.finish() if final else self._compressor.flush()
+        else:
+            out = self._compressor.compress(data)
+            out += self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.cpu_time += time.thread_time() - started
+        return out
+
+
+class CompressionMiddleware:
+    """Compress text responses with brotli or gzip, per ``Accept-Encoding``.
+
+    Bodies sent in one message are compressed only from ``minimum_size``
+    bytes on. Streaming bodies are compressed chunk by chunk and each chunk
+    is flushed as it arrives, so nothing is buffered. Responses that already
+    have a ``Content-Encoding`` (precompressed static files), are not text,
+    or ask for ``no-transform`` are passed through untouched. Strong ETags
+    of compressed responses get an ``-<encoding>`` suffix.
+
+    Records ``compression.bytes_in`` / ``compression.bytes_out`` (reported
+    as ``compression.ratio``) and the CPU time spent as ``compression.cpu``.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = {"br", "gzip"} if brotli is not None else {"gzip"}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), self.encodings)
+        if_none_match = request_headers.get("if-none-match", "")
+        start: Optional[Message] = None
+        compressor: Optional[Compressor] = None
+        bytes_in = bytes_out = 0
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, bytes_in, bytes_out
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 304 and encoding and "etag" in headers:
+                    # Confirm the tag of the compressed copy the client holds
+                    etag = encoded_etag(headers["etag"], encoding)
+                    if etag in if_none_match:
+                        MutableHeaders(raw=message["headers"])["ETag"] = etag
+                if (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not is_compressible(headers.get("content-type", ""))
+                    or "no-transform" in headers.get("cache-control", "")
+                ):
+                    await send(message)
+                    return
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(message)
+                    return
+                # Hold the headers until the first body chunk shows the size
+                start = message
+                return
+
+            if message["type"] != "http.response.body" or (
+                start is None and compressor is None
+            ):
+                if start is not None:  # e.g. http.response.pathsend: send as is
+                    pending, start = start, None
+                    await send(pending)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                pending, start = start, None
+                if not more_body and len(body) < self.minimum_size:
+                    await send(pending)
+                    await send(message)
+                    return
+                compressor = Compressor(encoding)
+                compressed = compressor.compress(body, final=not more_body)
+                headers = MutableHeaders(raw=pending["headers"])
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if not more_body:
+                    headers["Content-Length"] = str(len(compressed))
+                await send(pending)
+            else:
+                compressed = compressor.compress(body, final=not more_body)
+
+            bytes_in += len(body)
+            bytes_out += len(compressed)
+            await send({**message, "body": compressed})
+            if not more_body:
+                metrics.increment(f"compression.{encoding}")
+                metrics.increment("compression.bytes_in", bytes_in)
+                metrics.increment("compression.bytes_out", bytes_out)
+                metrics.observe("compression.cpu", compressor.cpu_time)
+
+        await self.app(scope, receive, send_compressed)
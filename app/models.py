@@ -6,6 +6,8 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Boolean,
+    Index,
+    func,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -34,7 +36,7 @@ class User(Base):
     name = Column(String(255))  # Full name
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
     last_login = Column(DateTime)
     role = Column(
         String(20), ForeignKey("roles.name"), default="user", nullable=False
@@ -44,6 +46,21 @@ class User(Base):
     todos = relationship("Todo", back_populates="user")
     role_info = relationship("Role", back_populates="users")
 
+    __table_args__ = (
+        # Serve the admin user search, which matches prefixes ignoring case
+        Index("ix_users_email_lower", func.lower(email)),
+        Index("ix_users_name_lower", func.lower(name)),
+    )
+
+
+class Stat(Base):
+    """A named counter maintained by app.stats."""
+
+    __tablename__ = "stats"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
 
 class Todo(Base):
     __tablename__ = "todos"
@@ -56,3 +73,8 @@ class Todo(Base):
 
     # Relationships
     user = relationship("User", back_populates="todos")
+
+    __table_args__ = (
+        # Serves "a user's todos, newest first" without scanning the table
+        Index("ix_todos_user_id_created_at", "user_id", "created_at"),
+    )
@@ -0,0 +1,267 @@
+"""Fingerprinted, precompressed static files.
+
+``build`` copies every file under ``app/static`` into ``app/static/dist``
+with a content hash in its name (``css/theme.css`` becomes
+``dist/css/theme.<hash>.css``), writes gzip and (when the optional
+``brotli`` package is installed) brotli variants next to each copy, and
+records the mapping in ``dist/manifest.json``. It runs at image build time
+through ``scripts/build_assets.py --manifest``.
+
+Templates call ``static_url("css/theme.css")``, which resolves to the
+hashed URL when the manifest exists and to the plain ``/static/`` URL
+otherwise (e.g. in development). Files made by ``scripts/build_assets.py``
+go through ``asset_url``, which falls back to their CDN copy until they
+are built. ``StaticAssets`` serves the mount: it
+sends the precompressed variant matching ``Accept-Encoding`` and marks
+hashed files ``immutable``.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+STATIC_URL = "/static/"
+DIST_DIR_NAME = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Files smaller than this are not worth precompressing
+PRECOMPRESS_MIN_SIZE = 256
+# Content encoding -> file suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Files scripts/build_assets.py creates (they are gitignored)
+BUILD_OUTPUTS = (
+    "vendor/htmx.min.js",
+    "vendor/_hyperscript.min.js",
+    "vendor/fontawesome/css/all.min.css",
+    "css/tailwind.css",
+)
+
+# Where pages load a build output from until it is built, e.g. while its
+# download has no pinned checksum. The versions match scripts/build_assets.py;
+# without a build, base.html uses the Tailwind Play CDN instead of
+# css/tailwind.css.
+CDN_URLS = {
+    "vendor/htmx.min.js": "https://unpkg.com/htmx.org@1.9.12/dist/htmx.min.js",
+    "vendor/_hyperscript.min.js": (
+        "https://unpkg.com/hyperscript.org@0.9.11/dist/_hyperscript.min.js"
+    ),
+    "vendor/fontawesome/css/all.min.css": (
+        "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css"
+    ),
+}
+
+# Matches the hash inserted by build(), e.g. theme.0123456789ab.css
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def hashed_name(path: str, content: bytes) -> str:
+    """Return ``path`` with a digest of ``content`` before its extension."""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    stem, dot, suffix = path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{path}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=11)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def build(static_dir: Path = STATIC_DIR) -> Dict[str, str]:
+    """Fingerprint and precompress ``static_dir`` into its ``dist`` directory.
+
+    Returns the manifest, mapping source paths to hashed paths (both
+    relative to ``static_dir``). Stylesheets are written last, with their
+    relative ``url()`` references rewritten to the hashed names.
+    """
+    dist_dir = static_dir / DIST_DIR_NAME
+    encodings = [e for e in ENCODINGS if e != "br" or brotli is not None]
+    if brotli is None:
+        logger.warning("brotli is not installed; writing gzip variants only")
+
+    sources = [
+        path
+        for path in static_dir.rglob("*")
+        if path.is_file() and dist_dir not in path.parents
+    ]
+    manifest = {}
+    for source in sorted(sources, key=lambda path: (path.suffix == ".css", path)):
+        relative = source.relative_to(static_dir).as_posix()
+        content = source.read_bytes()
+        if source.suffix == ".css":
+            content = rewrite_css_urls(content.decode(), relative, manifest).encode()
+        target = f"{DIST_DIR_NAME}/{hashed_name(relative, content)}"
+        manifest[relative] = target
+
+        path = static_dir / target
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        if len(content) < PRECOMPRESS_MIN_SIZE:
+            continue
+        for encoding in encodings:
+            compressed = compress(content, encoding)
+            if len(compressed) < len(content):
+                path.with_name(path.name + ENCODINGS[encoding]).write_bytes(compressed)
+
+    (dist_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    logger.info(f"Built {len(manifest)} static files into {dist_dir}")
+    return manifest
+
+
+def rewrite_css_urls(css: str, path: str, manifest: Dict[str, str]) -> str:
+    """Point relative ``url()`` references in ``path`` at their hashed copies."""
+    directory = posixpath.dirname(path)
+    target_directory = posixpath.join(DIST_DIR_NAME, directory)
+
+    def replace(match: re.Match) -> str:
+        quote, reference = match.group(1), match.group(2)
+        if reference.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        url, suffix = re.match(r"([^?#]*)(.*)", reference).groups()
+        source = posixpath.normpath(posixpath.join(directory, url))
+        if source not in manifest:
+            return match.group(0)
+        hashed = posixpath.relpath(manifest[source], target_directory)
+        return f"url({quote}{hashed}{suffix}{quote})"
+
+    return CSS_URL.sub(replace, css)
+
+
+def missing_build_outputs(static_dir: Path = STATIC_DIR) -> List[str]:
+    """Return the ``BUILD_OUTPUTS`` that do not exist under ``static_dir``."""
+    return [path for path in BUILD_OUTPUTS if not (static_dir / path).is_file()]
+
+
+def check_build_outputs() -> None:
+    """Log a warning when the frontend assets have not been built."""
+    missing = missing_build_outputs()
+    if missing:
+        logger.warning(
+            f"Frontend assets are missing ({', '.join(missing)}); pages load them "
+            "from CDNs until `python scripts/build_assets.py` builds them"
+        )
+
+
+@lru_cache(maxsize=None)
+def built_outputs(static_dir: Path = STATIC_DIR) -> frozenset:
+    """The ``BUILD_OUTPUTS`` that exist, checked once per process."""
+    return frozenset(BUILD_OUTPUTS) - set(missing_build_outputs(static_dir))
+
+
+def is_built(path: str) -> bool:
+    """Whether the build output ``path`` exists."""
+    return path in built_outputs()
+
+
+def asset_url(path: str) -> str:
+    """Return the URL of a build output, or its ``CDN_URLS`` copy until it is built."""
+    if is_built(path):
+        return static_url(path)
+    return CDN_URLS[path]
+
+
+@lru_cache(maxsize=None)
+def load_manifest(static_dir: Path = STATIC_DIR) -> Dict[str, str]:
+    """Read the manifest written by ``build``; empty when there is none."""
+    try:
+        return json.loads((static_dir / DIST_DIR_NAME / MANIFEST_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def static_url(path: str) -> str:
+    """Return the URL for a file under ``app/static``, hashed when built."""
+    path = path.lstrip("/")
+    return STATIC_URL + load_manifest().get(path, path)
+
+
+def accepted_encodings(header: str) -> set:
+    """Parse ``Accept-Encoding`` into the codings with a non-zero q-value."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(header: Optional[str], available) -> Optional[str]:
+    """Pick the preferred coding that the client accepts and we have."""
+    accepted = accepted_encodings(header or "")
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+class StaticAssets(StaticFiles):
+    """StaticFiles that serve precompressed variants and cache hashed files."""
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        variants = {
+            encoding: full_path + suffix
+            for encoding, suffix in ENCODINGS.items()
+            if os.path.isfile(full_path + suffix)
+        }
+        encoding = choose_encoding(request_headers.get("accept-encoding"), variants)
+
+        if encoding:
+            variant = variants[encoding]
+            response = FileResponse(
+                variant,
+                status_code=status_code,
+                stat_result=os.stat(variant),
+                media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+                headers={"Content-Encoding": encoding},
+            )
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        if variants:
+            response.headers.add_vary_header("Accept-Encoding")
+        hashed = HASHED_NAME.search(os.path.basename(full_path))
+        response.headers["Cache-Control"] = IMMUTABLE if hashed else REVALIDATE
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,23 +1,65 @@
-from fastapi import APIRouter, Depends, Request, Form
+from fastapi import APIRouter, Depends, Request, Form, Query
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from typing import Optional
 
-from . import models, database
+from . import models, database, pagination
 from .auth import get_current_active_user
+from .templating import templates
 
 router = APIRouter()
 
 
+def render_todo_list(todos) -> str:
+    """Render todo rows with the ``todos/items.html`` fragment in one pass."""
+    return templates.env.get_template("todos/items.html").render(todos=todos)
+
+
+def render_todo_item(todo: models.Todo) -> str:
+    """Render a single todo row."""
+    return render_todo_list([todo])
+
+
 @router.get("/todos")
 async def list_todos(
     request: Request,
+    limit: int = Query(
+        pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE
+    ),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    """Get all todos for the current user."""
-    todos = db.query(models.Todo).filter(models.Todo.user_id == current_user.id).all()
-    return {"todos": todos}
+    """Get a page of the current user's todos, newest first.
+
+    Pass the returned ``next_cursor`` as ``after`` (or ``prev_cursor`` as
+    ``before``) to fetch the neighbouring page.
+    """
+    page = await pagination.paginate(
+        db,
+        select(models.Todo).where(models.Todo.user_id == current_user.id),
+        (models.Todo.created_at, models.Todo.id),
+        limit=limit,
+        after=after,
+        before=before,
+    )
+    return {
+        "todos": [
+            {
+                "id": todo.id,
+                "content": todo.content,
+                "completed": todo.completed,
+                "created_at": todo.created_at,
+                "user_id": todo.user_id,
+            }
+            for todo in page.items
+        ],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
 
 
 @router.post("/todos")
@@ -25,86 +67,53 @@ async def create_todo(
     request: Request,
     content: str = Form(...),
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Create a new todo."""
     todo = models.Todo(
         content=content, user_id=current_user.id, created_at=datetime.utcnow()
     )
     db.add(todo)
-    db.commit()
-    db.refresh(todo)
+    await db.commit()
 
     # Return the HTML for the new todo item
-    return HTMLResponse(f"""
-        <div id="todo-{todo.id}" class="flex items-center gap-2 p-2 bg-theme-bg rounded-md">
-            <input type="checkbox" 
-                   hx-post="/todos/{todo.id}/toggle"
-                   hx-target="#todo-{todo.id}"
-                   hx-swap="outerHTML"
-                   class="form-checkbox">
-            <span class="flex-1">{todo.content}</span>
-            <button hx-delete="/todos/{todo.id}"
-                    hx-target="#todo-{todo.id}"
-                    hx-swap="outerHTML"
-                    class="text-theme-error hover:opacity-80">
-                <i class="fas fa-trash"></i>
-            </button>
-        </div>
-    """)
+    return HTMLResponse(render_todo_item(todo))
 
 
 @router.post("/todos/{todo_id}/toggle")
 async def toggle_todo(
     todo_id: int,
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Toggle a todo's completed status."""
-    todo = (
-        db.query(models.Todo)
-        .filter(models.Todo.id == todo_id, models.Todo.user_id == current_user.id)
-        .first()
+    todo = await db.scalar(
+        select(models.Todo).where(
+            models.Todo.id == todo_id, models.Todo.user_id == current_user.id
+        )
     )
 
     if todo:
         todo.completed = not todo.completed
-        db.commit()
-        db.refresh(todo)
-
-        return HTMLResponse(f"""
-            <div id="todo-{todo.id}" class="flex items-center gap-2 p-2 bg-theme-bg rounded-md">
-                <input type="checkbox" 
-                       {"checked" if todo.completed else ""}
-                       hx-post="/todos/{todo.id}/toggle"
-                       hx-target="#todo-{todo.id}"
-                       hx-swap="outerHTML"
-                       class="form-checkbox">
-                <span class="flex-1 {"line-through text-theme-fg1" if todo.completed else ""}">{todo.content}</span>
-                <button hx-delete="/todos/{todo.id}"
-                        hx-target="#todo-{todo.id}"
-                        hx-swap="outerHTML"
-                        class="text-theme-error hover:opacity-80">
-                    <i class="fas fa-trash"></i>
-                </button>
-            </div>
-        """)
+        await db.commit()
+
+        return HTMLResponse(render_todo_item(todo))
 
 
 @router.delete("/todos/{todo_id}")
 async def delete_todo(
     todo_id: int,
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Delete a todo."""
-    todo = (
-        db.query(models.Todo)
-        .filter(models.Todo.id == todo_id, models.Todo.user_id == current_user.id)
-        .first()
+    todo = await db.scalar(
+        select(models.Todo).where(
+            models.Todo.id == todo_id, models.Todo.user_id == current_user.id
+        )
     )
 
     if todo:
-        db.delete(todo)
-        db.commit()
+        await db.delete(todo)
+        await db.commit()
         return HTMLResponse("")
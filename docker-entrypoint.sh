@@ -3,13 +3,17 @@ set -e
 
 export VIRTUAL_ENV=/opt/venv
 
-# # Set up migrations if needed
-# echo "Setting up migrations..."
-# python scripts/setup_migrations.py
+# The development bind mount (.:/app) hides the assets built into the image
+echo "Building assets if missing..."
+python scripts/build_assets.py --if-missing
 
-# # Run migrations
-# echo "Running migrations..."
-# python scripts/run_migrations.py
+# Create the database or bring its schema up to date
+echo "Running migrations..."
+alembic upgrade head
+
+# Seed the admin user, roles and counters once, before the workers start
+echo "Bootstrapping database..."
+python scripts/bootstrap_db.py
 
 # Start the application
 echo "Starting web server..."
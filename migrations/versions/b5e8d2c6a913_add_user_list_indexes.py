@@ -0,0 +1,34 @@
+"""Add user list indexes
+
+Revision ID: b5e8d2c6a913
+Revises: 7c2f9e1b4d3a
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e8d2c6a913"
+down_revision: Union[str, None] = "7c2f9e1b4d3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_users_created_at"), "users", ["created_at"], unique=False)
+    # The admin user search matches prefixes of lower(email) / lower(name)
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=False)
+    op.create_index("ix_users_name_lower", "users", [sa.text("lower(name)")], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_name_lower", table_name="users")
+    op.drop_index("ix_users_email_lower", table_name="users")
+    op.drop_index(op.f("ix_users_created_at"), table_name="users")
@@ -0,0 +1,23 @@
+/** Tailwind build config; see scripts/build_assets.py. */
+module.exports = {
+  // Only classes used in these files end up in app/static/css/tailwind.css
+  content: ["./app/templates/**/*.html", "./app/**/*.py"],
+  theme: {
+    extend: {
+      // base.html repeats these for the CDN fallback used until the build runs
+      colors: {
+        theme: {
+          bg: "var(--theme-bg)",
+          bg1: "var(--theme-bg1)",
+          bg2: "var(--theme-bg2)",
+          fg: "var(--theme-fg)",
+          fg1: "var(--theme-fg1)",
+          accent: "var(--theme-accent)",
+          accent_hover: "var(--theme-accent_hover)",
+          success: "var(--theme-success)",
+          error: "var(--theme-error)",
+        },
+      },
+    },
+  },
+};
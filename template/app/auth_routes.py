@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional
 
-from . import database, models, schemas, auth, themes
+from . import database, models, schemas, auth, etags, themes
+from .templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_current_theme(request: Request) -> tuple[themes.ThemeColors, str]:
@@ -37,10 +37,12 @@ def set_theme_cookie(response: HTMLResponse, theme_name: str) -> None:
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """API endpoint for obtaining a token."""
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
+    user = await auth.authenticate_user_async(
+        db, form_data.username, form_data.password
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,10 +60,15 @@ async def login_for_access_token(
 async def register_page(request: Request):
     """Display registration page."""
     theme, current_theme = get_current_theme(request)
-    response = templates.TemplateResponse(
-        "register.html",
-        {"request": request, "theme": theme, "current_theme": current_theme},
-    )
+    etag = etags.page_etag(request, "register.html", current_theme)
+    if etags.matches(request, etag):
+        response = etags.page_not_modified(etag)
+    else:
+        response = templates.TemplateResponse(
+            "register.html",
+            {"request": request, "theme": theme, "current_theme": current_theme},
+        )
+        etags.apply(response, etag)
     set_theme_cookie(response, current_theme)
     return response
 
@@ -72,7 +79,7 @@ async def register_user(
     email: str = Form(...),
     password: str = Form(...),
     confirm_password: str = Form(...),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Register a new user."""
     theme, current_theme = get_current_theme(request)
@@ -92,7 +99,9 @@ async def register_user(
         return response
 
     # Check if user already exists
-    existing_user = db.query(models.User).filter(models.User.email == email).first()
+    existing_user = await db.scalar(
+        select(models.User).where(models.User.email == email)
+    )
     if existing_user:
         response = templates.TemplateResponse(
             "register.html",
@@ -107,7 +116,7 @@ async def register_user(
         return response
 
     # Create new user
-    hashed_password = auth.get_password_hash(password)
+    hashed_password = await auth.get_password_hash_async(password)
     new_user = models.User(
         email=email,
         hashed_password=hashed_password,
@@ -115,8 +124,8 @@ async def register_user(
         is_active=True,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    auth.invalidate_user(user_id=new_user.id, email=new_user.email)
 
     # Create success response with toast notification
     response = RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
@@ -131,10 +140,15 @@ async def register_user(
 async def login_page(request: Request):
     """Display login page."""
     theme, current_theme = get_current_theme(request)
-    response = templates.TemplateResponse(
-        "login.html",
-        {"request": request, "theme": theme, "current_theme": current_theme},
-    )
+    etag = etags.page_etag(request, "login.html", current_theme)
+    if etags.matches(request, etag):
+        response = etags.page_not_modified(etag)
+    else:
+        response = templates.TemplateResponse(
+            "login.html",
+            {"request": request, "theme": theme, "current_theme": current_theme},
+        )
+        etags.apply(response, etag)
     set_theme_cookie(response, current_theme)
     return response
 
@@ -145,13 +159,13 @@ async def login(
     email: str = Form(...),
     password: str = Form(...),
     remember_me: Optional[str] = Form(None),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Log in a user."""
     theme, current_theme = get_current_theme(request)
 
     # Authenticate user
-    user = auth.authenticate_user(db, email, password)
+    user = await auth.authenticate_user_async(db, email, password)
     if not user:
         response = templates.TemplateResponse(
             "login.html",
@@ -209,18 +223,10 @@ async def logout(request: Request):
     return response
 
 
-# Create a dependency that will check for authenticated user
-def user_dependency(
-    token: str = Depends(auth.oauth2_scheme), db: Session = Depends(database.get_db)
-):
-    return auth.get_current_user_sync(token, db)
-
-
 @router.get("/profile", response_class=HTMLResponse)
 async def profile(
     request: Request,
-    current_user: models.User = Depends(user_dependency),
-    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user),
 ):
     """Display user profile."""
     theme, current_theme = get_current_theme(request)
@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 import os
@@ -27,11 +30,96 @@ connect_args = (
     {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
 
+# SQLite settings applied to every new connection. Each can be overridden
+# with an environment variable named SQLITE_<SETTING>, e.g. SQLITE_SYNCHRONOUS=FULL.
+SQLITE_PRAGMA_DEFAULTS = {
+    "journal_mode": "WAL",  # Readers don't block the writer
+    "synchronous": "NORMAL",  # Safe with WAL; only the last commit can be lost on power loss
+    "cache_size": "-65536",  # Negative values are KiB, so 64 MiB of page cache
+    "mmap_size": "268435456",  # Memory-map up to 256 MiB of the database file
+    "temp_store": "MEMORY",
+    "busy_timeout": "5000",  # Wait up to 5s for a lock instead of "database is locked"
+    "foreign_keys": "ON",
+}
+
+
+def get_sqlite_pragmas() -> dict:
+    """Return the SQLite settings to apply, with environment overrides."""
+    return {
+        name: os.getenv(f"SQLITE_{name.upper()}", default)
+        for name, default in SQLITE_PRAGMA_DEFAULTS.items()
+    }
+
+
+def configure_sqlite_engine(engine, pragmas: dict = None) -> None:
+    """Apply ``pragmas`` to every connection the engine opens."""
+    pragmas = get_sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def get_active_sqlite_settings(engine) -> dict:
+    """Read back the effective value of each managed SQLite setting."""
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in SQLITE_PRAGMA_DEFAULTS
+        }
+
+
+def log_sqlite_settings(engine) -> None:
+    """Log the effective SQLite settings for ``engine``."""
+    if engine.dialect.name != "sqlite":
+        return
+    settings = get_active_sqlite_settings(engine)
+    logger.info(
+        "SQLite settings: "
+        + ", ".join(f"{name}={value}" for name, value in settings.items())
+    )
+
+
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+if engine.dialect.name == "sqlite":
+    configure_sqlite_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(url: str) -> str:
+    """Return the async driver URL for a sync database URL (sqlite -> aiosqlite)."""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://") :]
+    return url
+
+
+def create_async_session_factory(async_engine) -> async_sessionmaker:
+    """Build the AsyncSession factory used by async route handlers."""
+    # Objects stay usable after commit without a reload, as awaiting a lazy
+    # refresh from a template isn't possible.
+    return async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+    )
+
+
+# Async engine for async def route handlers; queries don't block the event loop
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+if async_engine.dialect.name == "sqlite":
+    configure_sqlite_engine(async_engine.sync_engine)
+AsyncSessionLocal = create_async_session_factory(async_engine)
+
 Base = declarative_base()
 
+# insert() constructs with ON CONFLICT support, by dialect name; other
+# databases fall back to portable statements where upserts are used
+UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
 
 def get_db():
     db = SessionLocal()
@@ -39,3 +127,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Streaming responses outlive the request's dependencies, so they open their
+# own session from this factory instead of using get_async_db
+def get_async_session_factory() -> async_sessionmaker:
+    """Return the AsyncSession factory for handlers that open their own sessions."""
+    return AsyncSessionLocal
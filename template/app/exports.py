@@ -0,0 +1,81 @@
+"""Streaming CSV / NDJSON exports.
+
+Rows are read from the database in chunks of ``EXPORT_CHUNK_SIZE`` through a
+streamed (server-side) result and each chunk is encoded and sent as soon as
+it is fetched, so memory use does not grow with the table size and the
+download starts with the first chunk.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_csv(rows: Sequence[Sequence], header: Optional[Sequence[str]] = None) -> str:
+    """Encode rows (and an optional header) as CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def encode_ndjson(rows: Sequence[Sequence], columns: Sequence[str]) -> str:
+    """Encode rows as newline-delimited JSON objects."""
+    return "".join(
+        json.dumps(dict(zip(columns, map(_value, row)))) + "\n" for row in rows
+    )
+
+
+async def stream_rows(
+    session_factory: async_sessionmaker,
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: str,
+) -> AsyncIterator[str]:
+    """Yield the encoded result of ``stmt`` one chunk at a time."""
+    if fmt == "csv":
+        yield encode_csv([], header=columns)
+
+    async with session_factory() as db:
+        result = await db.stream(
+            stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for chunk in result.partitions():
+            if fmt == "csv":
+                yield encode_csv(chunk)
+            else:
+                yield encode_ndjson(chunk, columns)
+
+
+def export_response(
+    session_factory: async_sessionmaker,
+    stmt: Select,
+    filename: str,
+    fmt: str,
+) -> StreamingResponse:
+    """Stream ``stmt`` as a CSV or NDJSON attachment named ``filename.<fmt>``."""
+    columns = [column.name for column in stmt.selected_columns]
+    return StreamingResponse(
+        stream_rows(session_factory, stmt, columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -1,5 +1,7 @@
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Union
+
+import jinja2
 from fastapi.templating import Jinja2Templates
 
 
@@ -11,6 +13,7 @@ def fromjson(value: str) -> Dict[str, Any]:
         return {}
 
 
-def register_filters(templates: Jinja2Templates) -> None:
-    """Register all custom filters with a Jinja2Templates instance."""
-    templates.env.filters["fromjson"] = fromjson
+def register_filters(templates: Union[Jinja2Templates, jinja2.Environment]) -> None:
+    """Register all custom filters with a Jinja2Templates instance or environment."""
+    env = templates if isinstance(templates, jinja2.Environment) else templates.env
+    env.filters["fromjson"] = fromjson
@@ -0,0 +1,126 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are selected with a row-value comparison on an indexed sort key such
+as ``(created_at, id)`` instead of OFFSET, so fetching any page costs the
+same however deep into the list it is. Cursors are opaque URL-safe tokens
+holding the sort key of the row a page starts or ends at.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class Page:
+    """One page of results plus the cursors for its neighbours."""
+
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode a row's sort key as an opaque cursor."""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_value(key: Any, value: Any) -> Any:
+    """Check a decoded cursor value against its key column's type."""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError("cursor values must be strings or numbers")
+    if isinstance(key.type, DateTime):
+        return datetime.fromisoformat(value)
+    try:
+        expected = key.type.python_type
+    except NotImplementedError:
+        return value
+    if expected is float:
+        expected = (int, float)
+    if not isinstance(value, expected):
+        raise ValueError("cursor value does not match its column")
+    return value
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> List[Any]:
+    """Decode a cursor for the given key columns, or raise a 400 error."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("cursor does not match the sort key")
+        return [decode_value(key, value) for key, value in zip(keys, values)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def row_key(item: Any, keys: Sequence[Any]) -> List[Any]:
+    """Return an item's sort key values."""
+    return [getattr(item, key.key) for key in keys]
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[Any],
+    *,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    descending: bool = True,
+) -> Page:
+    """Return the page of ``stmt`` after or before a cursor.
+
+    ``keys`` must uniquely order the rows (end with the primary key) and
+    should be covered by an index together with the statement's filters.
+    Items are always returned in list order; ``before`` reads the
+    preceding page backwards and reverses it.
+    """
+    if after and before:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'after' or 'before', not both",
+        )
+
+    backwards = before is not None
+    cursor = before if backwards else after
+    key = tuple_(*keys)
+    if cursor is not None:
+        values = tuple(decode_cursor(cursor, keys))
+        stmt = stmt.where(key < values if descending != backwards else key > values)
+
+    reverse_scan = descending != backwards
+    stmt = stmt.order_by(*(k.desc() if reverse_scan else k.asc() for k in keys))
+    rows = list((await db.scalars(stmt.limit(limit + 1))).all())
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    page = Page(items=rows)
+    if rows:
+        first = encode_cursor(row_key(rows[0], keys))
+        last = encode_cursor(row_key(rows[-1], keys))
+        if backwards:
+            page.prev_cursor = first if has_more else None
+            page.next_cursor = last
+        else:
+            page.next_cursor = last if has_more else None
+            page.prev_cursor = first if cursor is not None else None
+    return page
@@ -1,8 +1,17 @@
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional
 import json
+import os
+import threading
+import time
 from sqlalchemy.orm import Session
 from . import models
 
+# Seconds before a worker re-reads the roles table, so role changes made by
+# another worker are picked up. Changes made in this worker apply immediately.
+ROLE_CATALOG_TTL = int(os.getenv("ROLE_CATALOG_TTL", "30"))
+
 DEFAULT_ROLES = {
     "admin": {
         "description": "Full system access",
@@ -59,17 +68,88 @@ def ensure_default_roles_exist(db: Session):
         db.rollback()
         raise Exception(f"Error ensuring default roles exist: {e}")
 
+    role_catalog.load(db)
 
-def has_permission(user: models.User, permission: str) -> bool:
-    """Check if a user has a specific permission."""
-    if not user or not user.role_info:
-        return False
+
+def parse_permissions(role: Optional[models.Role]) -> dict:
+    """Parse a role's JSON permissions, returning an empty dict if invalid."""
+    if not role:
+        return {}
 
     try:
-        permissions = json.loads(user.role_info.permissions)
-        return permissions.get(permission, False)
-    except (json.JSONDecodeError, AttributeError):
+        permissions = json.loads(role.permissions)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return permissions if isinstance(permissions, dict) else {}
+
+
+@dataclass(frozen=True)
+class RoleInfo:
+    """Read-only summary of a role, as listed in forms."""
+
+    id: int
+    name: str
+    description: Optional[str]
+    permissions: FrozenSet[str]
+
+
+class RoleCatalog:
+    """In-memory map of role names to their granted permissions.
+
+    The catalog is built from the roles table in one pass and swapped in as
+    a single object, so readers always see a complete, consistent snapshot
+    and a permission check is a set lookup with no database I/O.
+    """
+
+    def __init__(self):
+        self._roles: Dict[str, RoleInfo] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """Rebuild the catalog from the database; call after role changes commit."""
+        roles = {}
+        for role in db.query(models.Role).order_by(models.Role.id):
+            permissions = parse_permissions(role)
+            roles[role.name] = RoleInfo(
+                id=role.id,
+                name=role.name,
+                description=role.description,
+                permissions=frozenset(
+                    name for name, granted in permissions.items() if granted
+                ),
+            )
+        with self._lock:
+            self._roles = roles
+            self._loaded_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Load the catalog if it is empty or older than ``ROLE_CATALOG_TTL``."""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > ROLE_CATALOG_TTL:
+            self.load(db)
+
+    def permissions(self, role_name: Optional[str]) -> FrozenSet[str]:
+        """Return the permissions granted to ``role_name`` (empty if unknown)."""
+        role = self._roles.get(role_name)
+        return role.permissions if role else frozenset()
+
+    def roles(self) -> List[RoleInfo]:
+        """Return all roles in creation order."""
+        return list(self._roles.values())
+
+    def __contains__(self, role_name: str) -> bool:
+        return role_name in self._roles
+
+
+role_catalog = RoleCatalog()
+
+
+def has_permission(user: models.User, permission: str) -> bool:
+    """Check if a user (or a cached user snapshot) has a specific permission."""
+    if not user:
         return False
+    return permission in role_catalog.permissions(user.role)
 
 
 def requires_permission(permission: str):
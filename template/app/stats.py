@@ -0,0 +1,159 @@
+"""Maintained counters for dashboard statistics.
+
+Counts of users and todos are kept in the ``stats`` table and adjusted in
+the same transaction as the ORM writes that change them, so reading them is
+a primary-key lookup instead of a table scan. Any write that bypasses the
+ORM (bulk inserts, manual SQL) must call ``bump`` itself; ``reconcile``
+recomputes every counter from the source tables to repair drift.
+
+Counter names:
+
+- ``users.total``, ``users.active``, ``users.inactive``
+- ``users.role.<role name>``
+- ``todos.open``, ``todos.completed``
+"""
+from collections import Counter
+from typing import Dict, List, Mapping
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import database, models
+
+
+def user_counters(is_active, role) -> Counter:
+    """Return the counters a user with these attributes contributes to."""
+    active = is_active is not False  # NULL counts as active, as in the model default
+    return Counter(
+        {
+            "users.total": 1,
+            "users.active" if active else "users.inactive": 1,
+            f"users.role.{role}": 1,
+        }
+    )
+
+
+def todo_counters(completed) -> Counter:
+    """Return the counters a todo with this status contributes to."""
+    return Counter({"todos.completed" if completed else "todos.open": 1})
+
+
+def bump(connection: Connection, deltas: Mapping[str, int]) -> None:
+    """Add ``deltas`` to the named counters on ``connection``'s transaction."""
+    rows = [{"name": name, "value": value} for name, value in deltas.items() if value]
+    if not rows:
+        return
+    upsert = database.UPSERT_INSERTS.get(connection.dialect.name)
+    if upsert is None:
+        _bump_each(connection, rows)
+        return
+    stmt = upsert(models.Stat)
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[models.Stat.name],
+            set_={"value": models.Stat.value + stmt.excluded.value},
+        ),
+        rows,
+    )
+
+
+def _bump_each(connection: Connection, rows: List[dict]) -> None:
+    """Portable ``bump``: UPDATE each counter, INSERT the ones that are missing."""
+    for row in rows:
+        updated = connection.execute(
+            update(models.Stat)
+            .where(models.Stat.name == row["name"])
+            .values(value=models.Stat.value + row["value"])
+        )
+        if not updated.rowcount:
+            connection.execute(insert(models.Stat).values(**row))
+
+
+def _before(obj, attr: str):
+    """Return an attribute's value as of the last flush."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+
+def _counters(obj, value=getattr) -> Counter:
+    if isinstance(obj, models.User):
+        return user_counters(value(obj, "is_active"), value(obj, "role"))
+    if isinstance(obj, models.Todo):
+        return todo_counters(value(obj, "completed"))
+    return Counter()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_changes(session: Session, flush_context) -> None:
+    """Apply the counter changes implied by a flush in its transaction."""
+    deltas = Counter()
+    for obj in session.new:
+        deltas.update(_counters(obj))
+    for obj in session.deleted:
+        deltas.subtract(_counters(obj, _before))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            deltas.update(_counters(obj))
+            deltas.subtract(_counters(obj, _before))
+    bump(session.connection(), deltas)
+
+
+def read(db: Session) -> Dict[str, int]:
+    """Return every counter by name."""
+    return dict(db.execute(select(models.Stat.name, models.Stat.value)).all())
+
+
+def compute(db: Session) -> Dict[str, int]:
+    """Count users and todos from the source tables (full scans)."""
+    counts = Counter()
+    users = db.execute(
+        select(models.User.is_active, models.User.role, func.count()).group_by(
+            models.User.is_active, models.User.role
+        )
+    )
+    for is_active, role, count in users:
+        for name in user_counters(is_active, role):
+            counts[name] += count
+
+    todos = db.execute(
+        select(models.Todo.completed, func.count()).group_by(models.Todo.completed)
+    )
+    for completed, count in todos:
+        for name in todo_counters(completed):
+            counts[name] += count
+
+    for name in ("users.total", "users.active", "users.inactive", "todos.open", "todos.completed"):
+        counts.setdefault(name, 0)
+    return dict(counts)
+
+
+def reconcile(db: Session) -> Dict[str, tuple]:
+    """Rewrite every counter from the source tables and commit.
+
+    Returns the counters that had drifted as ``{name: (stored, actual)}``.
+    """
+    stored = read(db)
+    actual = compute(db)
+    drift = {
+        name: (stored.get(name, 0), actual.get(name, 0))
+        for name in stored.keys() | actual.keys()
+        if stored.get(name, 0) != actual.get(name, 0)
+    }
+    db.execute(delete(models.Stat))
+    db.execute(
+        insert(models.Stat),
+        [{"name": name, "value": value} for name, value in actual.items()],
+    )
+    db.commit()
+    return drift
+
+
+def ensure_seeded(db: Session) -> None:
+    """Populate the counters from the source tables if none exist yet."""
+    if db.scalar(select(func.count()).select_from(models.Stat)) == 0:
+        reconcile(db)
@@ -0,0 +1,147 @@
+"""The application's single Jinja2 environment.
+
+Every router renders through the ``templates`` instance defined here, so
+compiled templates are cached once per worker. Templates are compiled to
+bytecode through a ``FileSystemBytecodeCache`` that persists across restarts
+and is shared by workers. ``auto_reload`` (re-checking template files on
+every render) is only on outside production.
+
+HTMX navigations that target the page's content area get only the
+matching block of the page template (see ``PARTIAL_TARGETS``) instead of
+the whole layout; such responses carry ``Vary: HX-Request, HX-Target``.
+"""
+import contextvars
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+
+from . import jinja_filters, static_assets
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+# Directory for compiled template bytecode; defaults to a per-user temp dir
+JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR") or None
+
+
+# HX-Target element id -> template block rendered for it
+PARTIAL_TARGETS = {"main-content": "content"}
+# Request headers that select between the full page and a partial
+PARTIAL_VARY = ("HX-Request", "HX-Target")
+
+# Block to render for the TemplateResponse currently being built
+_partial_block: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "partial_block", default=None
+)
+
+
+def is_production() -> bool:
+    """Return whether ``ENVIRONMENT`` is set to production."""
+    return os.getenv("ENVIRONMENT", "development").lower() == "production"
+
+
+def create_environment(
+    directory: Path = TEMPLATE_DIR,
+    auto_reload: Optional[bool] = None,
+    bytecode_cache_dir: Optional[str] = JINJA_BYTECODE_CACHE_DIR,
+) -> jinja2.Environment:
+    """Build the Jinja2 environment with the app's filters and ``static_url``."""
+    if auto_reload is None:
+        auto_reload = not is_production()
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(directory),
+        autoescape=True,
+        auto_reload=auto_reload,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(bytecode_cache_dir),
+    )
+    jinja_filters.register_filters(env)
+    env.globals["static_url"] = static_assets.static_url
+    env.globals["asset_url"] = static_assets.asset_url
+    env.globals["asset_built"] = static_assets.is_built
+    return env
+
+
+def warm_up_enabled() -> bool:
+    """Return whether to compile templates at startup (``TEMPLATE_WARMUP``).
+
+    Defaults to on in production.
+    """
+    default = "true" if is_production() else "false"
+    return os.getenv("TEMPLATE_WARMUP", default).lower() == "true"
+
+
+def warm_up(templates: Jinja2Templates) -> int:
+    """Compile every template ahead of the first request; returns the count."""
+    names = templates.env.list_templates()
+    for name in names:
+        templates.env.get_template(name)
+    logger.info(f"Compiled {len(names)} templates")
+    return len(names)
+
+
+def get_partial_block(request) -> Optional[str]:
+    """Return the block an HTMX request wants rendered, or None for a full page."""
+    headers = request.headers
+    if headers.get("hx-request") != "true":
+        return None
+    if headers.get("hx-history-restore-request") == "true":
+        return None
+    return PARTIAL_TARGETS.get(headers.get("hx-target"))
+
+
+class BlockTemplate:
+    """Renders a single block of a template in place of the whole template."""
+
+    def __init__(self, template: jinja2.Template, block: str):
+        self.template = template
+        self.block = block
+
+    def render(self, context: dict) -> str:
+        render_block = self.template.blocks[self.block]
+        return "".join(render_block(self.template.new_context(context)))
+
+
+class PartialTemplates(Jinja2Templates):
+    """Jinja2Templates that answer HTMX content navigations with one block."""
+
+    def TemplateResponse(self, *args: Any, **kwargs: Any):
+        request = _find_request(args, kwargs)
+        block = get_partial_block(request) if request is not None else None
+        token = _partial_block.set(block)
+        try:
+            response = super().TemplateResponse(*args, **kwargs)
+        finally:
+            _partial_block.reset(token)
+
+        template = getattr(response.template, "template", response.template)
+        if set(PARTIAL_TARGETS.values()) & set(template.blocks):
+            for header in PARTIAL_VARY:
+                response.headers.add_vary_header(header)
+        return response
+
+    def get_template(self, name: str):
+        template = super().get_template(name)
+        block = _partial_block.get()
+        if block and block in template.blocks:
+            return BlockTemplate(template, block)
+        return template
+
+
+def _find_request(args: tuple, kwargs: dict):
+    """Pick the request out of either TemplateResponse calling convention."""
+    if args and not isinstance(args[0], str):
+        return args[0]
+    if "request" in kwargs:
+        return kwargs["request"]
+    context = args[1] if len(args) > 1 else kwargs.get("context") or {}
+    return context.get("request")
+
+
+templates = PartialTemplates(env=create_environment())
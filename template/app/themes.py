@@ -1,5 +1,12 @@
-"""Theme management for the book tracking app."""
-from dataclasses import dataclass
+"""Theme management for the book tracking app.
+
+``THEMES`` is compiled once into a single stylesheet with one
+``[data-theme="..."]`` block per theme (see ``build_stylesheet``). The page
+links it under a content-hashed URL, so browsers cache it for good and a
+theme switch only changes the ``data-theme`` attribute.
+"""
+import hashlib
+from dataclasses import asdict, dataclass
 from typing import Dict, Optional
 
 @dataclass
@@ -15,6 +22,16 @@ class ThemeColors:
     success: str  # Success/positive color
     error: str  # Error/negative color
 
+@dataclass(frozen=True)
+class ThemeStylesheet:
+    """The compiled theme CSS and the digest used in its URL."""
+    css: str
+    digest: str
+
+
+# Theme used when the request names none (or an unknown one)
+DEFAULT_THEME = "gruvbox-dark"
+
 # Built-in themes
 THEMES: Dict[str, ThemeColors] = {
     "gruvbox-dark": ThemeColors(
@@ -88,3 +105,29 @@ THEMES: Dict[str, ThemeColors] = {
 def get_theme(name: str) -> Optional[ThemeColors]:
     """Get a theme by name."""
     return THEMES.get(name)
+
+
+def render_css(themes: Dict[str, ThemeColors], default: str = DEFAULT_THEME) -> str:
+    """Render ``themes`` as CSS custom properties, one block per theme.
+
+    The default theme also applies to ``:root`` so pages without a
+    (known) ``data-theme`` attribute are styled too. Its block comes first:
+    ``:root`` and ``[data-theme]`` are equally specific, so later blocks win.
+    """
+    blocks = []
+    for name, colors in sorted(themes.items(), key=lambda item: item[0] != default):
+        selector = f'[data-theme="{name}"]'
+        if name == default:
+            selector = f":root, {selector}"
+        lines = "".join(
+            f"  --theme-{key}: {value};\n" for key, value in asdict(colors).items()
+        )
+        blocks.append(f"{selector} {{\n{lines}}}\n")
+    return "\n".join(blocks)
+
+
+def build_stylesheet(themes: Dict[str, ThemeColors] = THEMES) -> ThemeStylesheet:
+    """Compile ``themes`` and fingerprint the result."""
+    css = render_css(themes)
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    return ThemeStylesheet(css=css, digest=digest)
@@ -0,0 +1,33 @@
+"""Add todo user indexes
+
+Revision ID: 7c2f9e1b4d3a
+Revises: 3ad4540a4ed1
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2f9e1b4d3a"
+down_revision: Union[str, None] = "3ad4540a4ed1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_todos_user_id_created_at",
+        "todos",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_user_id_created_at", table_name="todos")
@@ -0,0 +1,47 @@
+"""Add stats counters
+
+Revision ID: d41a7f0c2e58
+Revises: b5e8d2c6a913
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d41a7f0c2e58"
+down_revision: Union[str, None] = "b5e8d2c6a913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stats",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    # Seed the counters from the existing rows (see app.stats for the names)
+    op.execute(
+        """
+        INSERT INTO stats (name, value)
+        SELECT 'users.total', count(*) FROM users
+        UNION ALL SELECT 'users.active', count(*) FROM users WHERE is_active IS NOT 0
+        UNION ALL SELECT 'users.inactive', count(*) FROM users WHERE is_active IS 0
+        UNION ALL SELECT 'todos.open', count(*) FROM todos WHERE completed IS NOT 1
+        UNION ALL SELECT 'todos.completed', count(*) FROM todos WHERE completed IS 1
+        UNION ALL SELECT 'users.role.' || role, count(*) FROM users GROUP BY role
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("stats")
@@ -0,0 +1,124 @@
+"""Benchmark the per-request overhead of the auth cookie middleware.
+
+Compares the previous pair of ``@app.middleware("http")`` functions
+(``BaseHTTPMiddleware``) with the pure ASGI ``AuthCookieMiddleware``.
+Requests are driven straight through the ASGI interface against a trivial
+endpoint, so the numbers are middleware overhead plus routing only.
+
+Usage:
+    python scripts/bench_middleware.py [--requests 20000]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.middleware import AuthCookieMiddleware  # noqa: E402
+
+HEADERS = [
+    (b"host", b"testserver"),
+    (b"user-agent", b"bench"),
+    (b"accept", b"text/html"),
+    (b"accept-encoding", b"gzip, deflate, br"),
+    (b"cookie", b"theme=gruvbox-dark; access_token=header.payload.signature"),
+]
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+async def protect_docs_routes(request, call_next):
+    # Same shape as the previous middleware for a non-docs path
+    if request.url.path in ["/docs", "/redoc", "/openapi.json"]:
+        pass
+    return await call_next(request)
+
+
+async def cookie_to_authorization(request, call_next):
+    # Previous implementation, verbatim
+    token = request.cookies.get("access_token")
+    has_auth_header = False
+    for k, v in request.scope.get("headers", []):
+        if k.decode().lower() == "authorization":
+            has_auth_header = True
+            break
+    if token and not has_auth_header:
+        headers = list(request.scope.get("headers", []))
+        auth_value = f"Bearer {token}"
+        headers.append((b"authorization", auth_value.encode()))
+        request.scope["headers"] = headers
+    return await call_next(request)
+
+
+def build_apps():
+    routes = [Route("/", endpoint)]
+    before = Starlette(
+        routes=routes,
+        middleware=[
+            Middleware(BaseHTTPMiddleware, dispatch=cookie_to_authorization),
+            Middleware(BaseHTTPMiddleware, dispatch=protect_docs_routes),
+        ],
+    )
+    after = Starlette(routes=routes, middleware=[Middleware(AuthCookieMiddleware)])
+    baseline = Starlette(routes=routes)
+    return {"no middleware": baseline, "before": before, "after": after}
+
+
+async def drive(app, count: int) -> float:
+    """Send ``count`` GET requests through ``app`` and return seconds elapsed."""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(count):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/",
+            "raw_path": b"/",
+            "query_string": b"",
+            "root_path": "",
+            "headers": list(HEADERS),
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def main(count: int) -> None:
+    apps = build_apps()
+    for app in apps.values():
+        await drive(app, 200)  # warm up
+
+    results = {name: await drive(app, count) for name, app in apps.items()}
+    base = results["no middleware"]
+    print(f"{count} requests per variant")
+    for name, elapsed in results.items():
+        per_request = elapsed / count * 1e6
+        overhead = (elapsed - base) / count * 1e6
+        print(f"  {name:<14} {per_request:8.1f} us/request  (+{overhead:6.1f} us middleware)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,78 @@
+"""Benchmark the per-row cost of rendering todo fragments.
+
+Compares the previous f-string markup in ``todo_routes`` with the shared
+``todos/items.html`` fragment, rendering rows one call at a time (the HTMX
+endpoints) and as a whole list in one call (the home page). The fragment
+escapes todo content, which the f-string did not.
+
+Usage:
+    ENVIRONMENT=production python scripts/bench_todo_render.py [--rows 200] [--repeat 200]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.todo_routes import render_todo_item, render_todo_list  # noqa: E402
+
+
+def fstring_item(todo) -> str:
+    # Previous implementation from toggle_todo, verbatim (without escaping)
+    return f"""
+            <div id="todo-{todo.id}" class="flex items-center gap-2 p-2 bg-theme-bg rounded-md">
+                <input type="checkbox" 
+                       {"checked" if todo.completed else ""}
+                       hx-post="/todos/{todo.id}/toggle"
+                       hx-target="#todo-{todo.id}"
+                       hx-swap="outerHTML"
+                       class="form-checkbox">
+                <span class="flex-1 {"line-through text-theme-fg1" if todo.completed else ""}">{todo.content}</span>
+                <button hx-delete="/todos/{todo.id}"
+                        hx-target="#todo-{todo.id}"
+                        hx-swap="outerHTML"
+                        class="text-theme-error hover:opacity-80">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        """
+
+
+def bench(render, todos, repeat: int) -> float:
+    """Return microseconds per row for ``render(todos)`` over ``repeat`` runs."""
+    render(todos)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render(todos)
+    return (time.perf_counter() - start) / (repeat * len(todos)) * 1e6
+
+
+def main(rows: int, repeat: int) -> None:
+    todos = [
+        SimpleNamespace(
+            id=i,
+            content=f"Todo number {i} <with> some & text",
+            completed=i % 3 == 0,
+            created_at=datetime.utcnow(),
+        )
+        for i in range(rows)
+    ]
+    variants = {
+        "f-string (before)": lambda items: "".join(fstring_item(t) for t in items),
+        "fragment per row": lambda items: "".join(render_todo_item(t) for t in items),
+        "fragment bulk": render_todo_list,
+    }
+    print(f"{rows} rows x {repeat} runs")
+    for name, render in variants.items():
+        print(f"  {name:<18} {bench(render, todos, repeat):7.2f} us/row")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,26 @@
+"""Seed the database with the dashboard counters, default admin and roles.
+
+Run once per deployment, after migrations and before starting the server
+workers (the container entrypoint does). Does nothing if the database is
+already bootstrapped:
+
+    python scripts/bootstrap_db.py
+"""
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import bootstrap, database  # noqa: E402
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    database.log_sqlite_settings(database.engine)
+    bootstrap.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
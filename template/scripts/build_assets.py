@@ -0,0 +1,248 @@
+"""Build the frontend assets served from app/static.
+
+Vendors pinned releases of htmx, _hyperscript and Font Awesome (CSS and
+webfonts) into ``app/static/vendor`` and compiles a purged, minified
+Tailwind stylesheet from the classes used in ``app/templates`` into
+``app/static/css/tailwind.css``. Pages then load nothing from a CDN.
+
+Tailwind is compiled with the standalone CLI (no Node.js needed): a
+``tailwindcss`` found on PATH is used, otherwise the pinned release is
+downloaded into ``.cache/``. Vendored files that already exist are kept
+unless ``--force`` is given. Run it again after adding Tailwind classes.
+``--if-missing`` does nothing when every output already exists; the
+container entrypoint uses it because the development bind mount hides the
+files built into the image.
+
+Every download is checked against the sha256 recorded for its URL in
+``assets/checksums.json`` and the build fails on a mismatch. A download
+with no recorded sha256 is skipped, and pages keep loading that file from
+its CDN (see ``CDN_URLS`` in ``app/static_assets.py``). After changing a
+version, run ``--pin`` (it downloads each artifact, including the Tailwind
+CLI for every platform, and records its sha256) and review and commit the
+updated file.
+
+With ``--manifest`` (used for deployments), every static file is then
+copied under a content-hashed name with gzip/brotli variants and listed in
+``app/static/dist/manifest.json``; see ``app/static_assets.py``.
+
+Usage:
+    python scripts/build_assets.py [--force] [--skip-vendor] [--skip-css] [--manifest] [--if-missing]
+    python scripts/build_assets.py --pin
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+import urllib.request
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app import static_assets  # noqa: E402
+
+STATIC_DIR = ROOT / "app" / "static"
+VENDOR_DIR = STATIC_DIR / "vendor"
+CACHE_DIR = ROOT / ".cache"
+
+HTMX_VERSION = "1.9.12"
+HYPERSCRIPT_VERSION = "0.9.11"
+FONTAWESOME_VERSION = "6.5.1"
+TAILWIND_VERSION = "3.4.17"
+
+# Vendored file -> download URL
+SCRIPTS = {
+    "htmx.min.js": f"https://unpkg.com/htmx.org@{HTMX_VERSION}/dist/htmx.min.js",
+    "_hyperscript.min.js": (
+        f"https://unpkg.com/hyperscript.org@{HYPERSCRIPT_VERSION}/dist/_hyperscript.min.js"
+    ),
+}
+FONTAWESOME_URL = (
+    f"https://use.fontawesome.com/releases/v{FONTAWESOME_VERSION}/"
+    f"fontawesome-free-{FONTAWESOME_VERSION}-web.zip"
+)
+TAILWIND_URL = (
+    f"https://github.com/tailwindlabs/tailwindcss/releases/download/"
+    f"v{TAILWIND_VERSION}/tailwindcss-{{platform}}"
+)
+
+TAILWIND_PLATFORMS = (
+    "linux-x64", "linux-arm64", "macos-x64", "macos-arm64", "windows-x64.exe"
+)
+
+# URL -> sha256 of every download, written by --pin
+CHECKSUMS_FILE = ROOT / "assets" / "checksums.json"
+
+TAILWIND_CONFIG = ROOT / "tailwind.config.js"
+TAILWIND_INPUT = ROOT / "assets" / "tailwind.css"
+TAILWIND_OUTPUT = STATIC_DIR / "css" / "tailwind.css"
+
+
+def fetch(url: str) -> bytes:
+    print(f"Downloading {url}")
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def load_checksums() -> dict:
+    try:
+        return json.loads(CHECKSUMS_FILE.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def download(url: str) -> Optional[bytes]:
+    """Download ``url`` and check it against its pinned sha256.
+
+    Returns ``None`` without downloading when ``url`` has no pinned sha256.
+    """
+    expected = load_checksums().get(url)
+    if expected is None:
+        print(
+            f"Skipping {url}: no pinned sha256 in {CHECKSUMS_FILE.relative_to(ROOT)} "
+            "(pages load it from a CDN; run `python scripts/build_assets.py --pin`)"
+        )
+        return None
+    content = fetch(url)
+    actual = hashlib.sha256(content).hexdigest()
+    if actual != expected:
+        sys.exit(f"Checksum mismatch for {url}: expected {expected}, got {actual}")
+    return content
+
+
+def pinned_urls() -> list:
+    """Every URL this script downloads, on any platform."""
+    urls = list(SCRIPTS.values()) + [FONTAWESOME_URL]
+    urls += [TAILWIND_URL.format(platform=name) for name in TAILWIND_PLATFORMS]
+    return urls
+
+
+def pin() -> None:
+    """Download every artifact and record its sha256 in ``CHECKSUMS_FILE``."""
+    checksums = {url: hashlib.sha256(fetch(url)).hexdigest() for url in pinned_urls()}
+    CHECKSUMS_FILE.write_text(json.dumps(checksums, indent=2, sort_keys=True) + "\n")
+    print(f"Wrote {len(checksums)} checksums to {CHECKSUMS_FILE.relative_to(ROOT)}")
+
+
+def vendor_scripts(force: bool) -> None:
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for name, url in SCRIPTS.items():
+        path = VENDOR_DIR / name
+        if force or not path.exists():
+            content = download(url)
+            if content is not None:
+                path.write_bytes(content)
+
+
+def vendor_fontawesome(force: bool) -> None:
+    """Extract the CSS and webfonts, keeping the ``css/../webfonts`` layout."""
+    target = VENDOR_DIR / "fontawesome"
+    if target.exists() and not force:
+        return
+    content = download(FONTAWESOME_URL)
+    if content is None:
+        return
+    shutil.rmtree(target, ignore_errors=True)
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        for member in archive.infolist():
+            # Entries look like fontawesome-free-6.5.1-web/css/all.min.css
+            _, _, relative = member.filename.partition("/")
+            if member.is_dir() or not (
+                relative == "css/all.min.css" or relative.startswith("webfonts/")
+            ):
+                continue
+            path = target / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(archive.read(member))
+    (target / "LICENSE.txt").write_text(
+        f"Font Awesome Free {FONTAWESOME_VERSION}: https://fontawesome.com/license/free\n"
+    )
+
+
+def tailwind_platform() -> str:
+    system = {"Linux": "linux", "Darwin": "macos", "Windows": "windows"}[platform.system()]
+    machine = platform.machine().lower()
+    arch = "arm64" if machine in ("arm64", "aarch64") else "x64"
+    return f"{system}-{arch}" + (".exe" if system == "windows" else "")
+
+
+def tailwind_executable() -> Optional[str]:
+    """Return the Tailwind CLI on PATH, or download the pinned release."""
+    found = shutil.which("tailwindcss")
+    if found:
+        return found
+    path = CACHE_DIR / f"tailwindcss-{TAILWIND_VERSION}-{tailwind_platform()}"
+    if not path.exists():
+        content = download(TAILWIND_URL.format(platform=tailwind_platform()))
+        if content is None:
+            return None
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def build_tailwind() -> None:
+    """Compile only the classes the templates use, minified."""
+    executable = tailwind_executable()
+    if executable is None:
+        return
+    subprocess.run(
+        [
+            executable,
+            "--config", str(TAILWIND_CONFIG),
+            "--input", str(TAILWIND_INPUT),
+            "--output", str(TAILWIND_OUTPUT),
+            "--minify",
+        ],
+        cwd=ROOT,
+        env={**os.environ, "NODE_ENV": "production"},
+        check=True,
+    )
+    print(f"Wrote {TAILWIND_OUTPUT.relative_to(ROOT)} ({TAILWIND_OUTPUT.stat().st_size} bytes)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="re-download vendored files")
+    parser.add_argument("--skip-vendor", action="store_true", help="do not vendor JS/fonts")
+    parser.add_argument("--skip-css", action="store_true", help="do not compile Tailwind")
+    parser.add_argument(
+        "--manifest", action="store_true", help="fingerprint and precompress app/static"
+    )
+    parser.add_argument(
+        "--if-missing", action="store_true", help="skip the build if every output exists"
+    )
+    parser.add_argument(
+        "--pin", action="store_true", help=f"record download checksums in {CHECKSUMS_FILE.name}"
+    )
+    args = parser.parse_args()
+
+    if args.pin:
+        pin()
+        return 0
+
+    if args.if_missing and not static_assets.missing_build_outputs(STATIC_DIR):
+        print("Assets already built")
+    else:
+        if not args.skip_vendor:
+            vendor_scripts(args.force)
+            vendor_fontawesome(args.force)
+        if not args.skip_css:
+            build_tailwind()
+    if args.manifest:
+        manifest = static_assets.build(STATIC_DIR)
+        print(f"Wrote {len(manifest)} hashed files to {STATIC_DIR.relative_to(ROOT)}/dist")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Generate load with scripted user journeys and report latency per route.
+
+Two journeys are scripted, each on its own cookie jar:
+
+* user: register, log in, add ``--todos`` todos, list them, toggle and
+  then delete each one, load the home page.
+* admin: log in as ``ADMIN_EMAIL`` / ``ADMIN_PASSWORD``, then load the
+  dashboard, the user list, a search of its rows and the roles page.
+
+``--users`` user journeys and ``--admins`` admin journeys are run with at
+most ``--concurrency`` of them in flight. Without ``--url`` the requests go
+in-process to ``--app`` over httpx's ASGI transport, with its lifespan run
+first, against the database given by ``--database`` (a migrated scratch
+database or a copy, since the journeys register users and write todos).
+The script refuses to run in-process without one, or against the app's
+default ``data/app.db``. With ``--url`` they go to a running server
+instead.
+
+Each request is recorded under its route template (``POST
+/todos/{id}/toggle``). The report gives p50/p95/p99 latency and
+requests/second per route and overall; requests/second is the route's
+request count over the wall-clock time of the whole run. The script exits
+with status 1 if any request got an unexpected status.
+
+Usage:
+    python scripts/load_test.py (--url http://localhost:8000 | --database sqlite:///./data/load.db) [--users 20] [--admins 5] [--concurrency 10] [--todos 50] [--json]
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import math
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager, redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy.engine import make_url
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The app's database when DATABASE_URL is not set
+DEFAULT_DATABASE = ROOT / "data" / "app.db"
+
+ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@example.com")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
+PASSWORD = "load-test-password"
+
+# GET /todos returns at most this many per page
+TODO_PAGE_SIZE = 100
+
+PERCENTILES = (50, 95, 99)
+
+
+class Recorder:
+    """Collects latencies and unexpected statuses by route template."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        route: Optional[str] = None,
+        expect: tuple = (200,),
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request, recording it under ``"METHOD route"``."""
+        name = f"{method} {route or url.split('?')[0]}"
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        if response.status_code not in expect:
+            self.errors[name] += 1
+        return response
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    stats = {"requests": len(latencies), "errors": errors}
+    for pct in PERCENTILES:
+        stats[f"p{pct}_ms"] = round(percentile(latencies, pct), 2)
+    stats["rps"] = round(len(latencies) / elapsed, 1)
+    return stats
+
+
+async def list_todo_ids(recorder: Recorder, client: httpx.AsyncClient) -> List[int]:
+    ids, after = [], None
+    while True:
+        params = {"limit": TODO_PAGE_SIZE, **({"after": after} if after else {})}
+        response = await recorder.request(client, "GET", "/todos", params=params)
+        page = response.json()
+        ids.extend(todo["id"] for todo in page["todos"])
+        after = page["next_cursor"]
+        if not after:
+            return ids
+
+
+async def login(recorder: Recorder, client: httpx.AsyncClient, email: str, password: str) -> None:
+    await recorder.request(
+        client,
+        "POST",
+        "/login",
+        data={"email": email, "password": password},
+        expect=(303,),
+    )
+
+
+async def user_journey(recorder: Recorder, client: httpx.AsyncClient, todos: int) -> None:
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    await recorder.request(client, "GET", "/register")
+    await recorder.request(
+        client,
+        "POST",
+        "/register",
+        data={"email": email, "password": PASSWORD, "confirm_password": PASSWORD},
+        expect=(303,),
+    )
+    await recorder.request(client, "GET", "/login")
+    await login(recorder, client, email, PASSWORD)
+
+    for n in range(todos):
+        await recorder.request(client, "POST", "/todos", data={"content": f"Todo {n}"})
+    ids = await list_todo_ids(recorder, client)
+    for todo_id in ids:
+        await recorder.request(
+            client, "POST", f"/todos/{todo_id}/toggle", route="/todos/{id}/toggle"
+        )
+    for todo_id in ids:
+        await recorder.request(client, "DELETE", f"/todos/{todo_id}", route="/todos/{id}")
+    await recorder.request(client, "GET", "/")
+
+
+async def admin_journey(recorder: Recorder, client: httpx.AsyncClient) -> None:
+    await login(recorder, client, ADMIN_EMAIL, ADMIN_PASSWORD)
+    await recorder.request(client, "GET", "/admin/dashboard")
+    await recorder.request(client, "GET", "/admin/users")
+    await recorder.request(client, "GET", "/admin/users/rows", params={"q": "load-"})
+    await recorder.request(client, "GET", "/admin/roles")
+
+
+@asynccontextmanager
+async def client_factory(url: Optional[str], app_path: str):
+    """Yield a function creating clients for ``url`` or the in-process app."""
+    if url:
+        yield lambda: httpx.AsyncClient(base_url=url, timeout=60)
+        return
+
+    module_name, _, attr = app_path.partition(":")
+    app = getattr(importlib.import_module(module_name), attr)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        yield lambda: httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=60
+        )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with client_factory(args.url, args.app) as new_client:
+
+        async def journey(script, *script_args):
+            async with semaphore, new_client() as client:
+                await script(recorder, client, *script_args)
+
+        journeys = [journey(user_journey, args.todos) for _ in range(args.users)]
+        journeys += [journey(admin_journey) for _ in range(args.admins)]
+        started = time.perf_counter()
+        await asyncio.gather(*journeys)
+        elapsed = time.perf_counter() - started
+
+    routes = {
+        name: summarize(latencies, recorder.errors[name], elapsed)
+        for name, latencies in sorted(recorder.latencies.items())
+    }
+    all_latencies = [ms for latencies in recorder.latencies.values() for ms in latencies]
+    return {
+        "target": args.url or args.app,
+        "users": args.users,
+        "admins": args.admins,
+        "concurrency": args.concurrency,
+        "todos_per_user": args.todos,
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize(all_latencies, sum(recorder.errors.values()), elapsed),
+        "routes": routes,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['users']} user + {report['admins']} admin journeys against "
+        f"{report['target']} ({report['concurrency']} concurrent) in {report['elapsed_s']} s"
+    )
+    header = f"  {'route':<28} {'requests':>8} {'errors':>6} "
+    header += " ".join(f"{f'p{pct} ms':>8}" for pct in PERCENTILES) + f" {'req/s':>8}"
+    print(header)
+    rows = list(report["routes"].items()) + [("total", report["total"])]
+    for name, stats in rows:
+        line = f"  {name:<28} {stats['requests']:>8} {stats['errors']:>6} "
+        line += " ".join(f"{stats[f'p{pct}_ms']:>8.1f}" for pct in PERCENTILES)
+        print(line + f" {stats['rps']:>8.1f}")
+
+
+def is_default_database(url: str) -> bool:
+    """Whether ``url`` is the SQLite file the app uses by default."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or not parsed.database:
+        return False
+    # Relative SQLite paths are relative to the working directory
+    return Path(parsed.database).resolve() == DEFAULT_DATABASE.resolve()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: in-process)")
+    parser.add_argument("--app", default="app.main:app", help="module:attribute of the app")
+    parser.add_argument("--database", help="database URL for in-process runs")
+    parser.add_argument("--users", type=int, default=20, help="user journeys to run")
+    parser.add_argument("--admins", type=int, default=5, help="admin journeys to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="journeys in flight at once")
+    parser.add_argument("--todos", type=int, default=50, help="todos each user adds")
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+    if not args.url:
+        if not args.database:
+            parser.error("in-process runs need --database (a scratch database), or use --url")
+        if is_default_database(args.database):
+            parser.error(f"refusing to write load-test users into {DEFAULT_DATABASE}")
+        # Set before the app (and its database module) is imported
+        os.environ["DATABASE_URL"] = args.database
+
+    # One log line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Keep stdout for the report (the app prints e.g. when it creates the admin)
+    with redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""Recompute the dashboard counters from the users and todos tables.
+
+Run after bulk changes made outside the application, or whenever the
+dashboard numbers look wrong:
+
+    python scripts/reconcile_stats.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import database, stats  # noqa: E402
+
+
+def main() -> int:
+    with database.SessionLocal() as db:
+        drift = stats.reconcile(db)
+    if not drift:
+        print("Counters are up to date")
+        return 0
+    for name, (stored, actual) in sorted(drift.items()):
+        print(f"{name}: {stored} -> {actual}")
+    print(f"Fixed {len(drift)} counter(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Measure cold-start cost of the app against an import-time budget.
+
+Each run starts a fresh interpreter. One pass runs ``python -X importtime``
+to break the import of the app module down by package and module. Another
+pass times the import, the lifespan startup and the first response to
+``--path``, sent in-process through the ASGI interface. The script exits
+with status 1 if the median import time or time to first response is over
+budget. It also fails if a module that should load lazily
+(``LAZY_MODULES``) is imported at startup.
+
+Budgets default to ``STARTUP_IMPORT_BUDGET_MS`` and
+``STARTUP_FIRST_RESPONSE_BUDGET_MS``. tests/test_startup.py runs this
+script with budgets several times a typical cold start, so that only a
+real regression fails on a slow machine; the same variables tighten them.
+
+Usage:
+    python scripts/startup_budget.py [--app app.main:app] [--path /login] [--runs 3] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+FIRST_RESPONSE_BUDGET_MS = float(os.getenv("STARTUP_FIRST_RESPONSE_BUDGET_MS", "2500"))
+
+# Heavy dependencies that must only be imported on first use
+LAZY_MODULES = ("passlib", "bcrypt", "jose", "cryptography")
+
+# Runs in the child interpreter: import, start up, answer one request
+TIMING_CODE = """
+import asyncio, importlib, json, sys, time
+started = time.perf_counter()
+module_name, _, attr = sys.argv[1].partition(":")
+app = getattr(importlib.import_module(module_name), attr)
+imported = time.perf_counter()
+
+import httpx
+
+async def first_response():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get(sys.argv[2])
+        return ready, response.status_code
+
+ready, status = asyncio.run(first_response())
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_response_ms": (done - started) * 1000,
+    "status": status,
+}))
+"""
+
+
+def run_child(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` for each ``-X importtime`` line."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure_imports(app_path: str, env: Dict[str, str]) -> List[Tuple[str, int, int]]:
+    module_name = app_path.partition(":")[0]
+    result = run_child(["-X", "importtime", "-c", f"import {module_name}"], env)
+    return parse_importtime(result.stderr)
+
+
+def measure_first_response(app_path: str, path: str, env: Dict[str, str]) -> dict:
+    result = run_child(["-c", TIMING_CODE, app_path, path], env)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(modules: List[Tuple[str, int, int]], top: int) -> dict:
+    by_package = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    slowest = sorted(modules, key=lambda module: module[2], reverse=True)
+    imported = {name.split(".")[0] for name, _, _ in modules}
+    return {
+        "packages_ms": {name: round(us / 1000, 1) for name, us in packages[:top]},
+        "modules_ms": {name: round(cum / 1000, 1) for name, _, cum in slowest[:top]},
+        "eager_lazy_modules": [name for name in LAZY_MODULES if name in imported],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="app.main:app", help="module:attribute of the app")
+    parser.add_argument("--path", default="/login", help="path of the first request")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to take the median of")
+    parser.add_argument("--top", type=int, default=15, help="rows in the breakdowns")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument(
+        "--first-response-budget-ms", type=float, default=FIRST_RESPONSE_BUDGET_MS
+    )
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    report = summarize(measure_imports(args.app, env), args.top)
+    timings = [measure_first_response(args.app, args.path, env) for _ in range(args.runs)]
+    for key in ("import_ms", "startup_ms", "first_response_ms"):
+        report[key] = round(statistics.median(t[key] for t in timings), 1)
+    report["status"] = timings[-1]["status"]
+    report["budgets_ms"] = {
+        "import_ms": args.import_budget_ms,
+        "first_response_ms": args.first_response_budget_ms,
+    }
+    report["over_budget"] = [
+        key for key, budget in report["budgets_ms"].items() if report[key] > budget
+    ]
+    ok = not report["over_budget"] and not report["eager_lazy_modules"]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0 if ok else 1
+
+    print(f"Import time by package (self, ms) for {args.app}:")
+    for name, ms in report["packages_ms"].items():
+        print(f"  {name:<30} {ms:>8.1f}")
+    print("Slowest modules (cumulative, ms):")
+    for name, ms in report["modules_ms"].items():
+        print(f"  {name:<50} {ms:>8.1f}")
+    print(
+        f"Median of {args.runs} cold start(s): import {report['import_ms']} ms, "
+        f"lifespan {report['startup_ms']} ms, "
+        f"first response ({args.path} -> {report['status']}) {report['first_response_ms']} ms"
+    )
+    for key in report["over_budget"]:
+        print(f"OVER BUDGET: {key} {report[key]} ms > {report['budgets_ms'][key]} ms")
+    for name in report["eager_lazy_modules"]:
+        print(f"EAGER IMPORT: {name} should only be imported on first use")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
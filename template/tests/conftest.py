@@ -1,36 +1,56 @@
+import atexit
+import os
+import shutil
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import Request
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from datetime import datetime
 
-from fastapi.templating import Jinja2Templates
 from app.main import app
-from app.database import get_db
+from app import auth
+from app.database import (
+    get_db,
+    get_async_db,
+    get_async_session_factory,
+    configure_sqlite_engine,
+    create_async_session_factory,
+    get_async_database_url,
+)
 from app.models import Base, User  # Import Base from models and all models
 from app.auth import create_access_token, get_password_hash
 from app.roles import ensure_default_roles_exist
-from app.jinja_filters import register_filters
+from app.templating import templates as test_templates
 
-# Create and configure test-specific templates
-test_templates = Jinja2Templates(directory="app/templates")
-register_filters(test_templates)
-
-# Override the templates in the app for testing
+# Render with the app's shared templates
 app.state.templates = test_templates
 
-# Use in-memory SQLite for tests
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# Use a temporary SQLite file for tests, so the sync and async engines
+# (pysqlite and aiosqlite) see the same database
+test_db_dir = tempfile.mkdtemp(prefix="app-tests-")
+atexit.register(shutil.rmtree, test_db_dir, ignore_errors=True)
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(test_db_dir, 'test.db')}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
+configure_sqlite_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The test client runs each request on its own event loop, so async
+# connections must not be pooled between requests
+async_engine = create_async_engine(
+    get_async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool
+)
+configure_sqlite_engine(async_engine.sync_engine)
+TestingAsyncSessionLocal = create_async_session_factory(async_engine)
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -40,6 +60,9 @@ def db():
 
     db = TestingSessionLocal()
 
+    # Per-worker caches must not leak users between test databases
+    auth.invalidate_all_users()
+
     # Create default roles using the helper function
     ensure_default_roles_exist(db)
 
@@ -50,6 +73,23 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def executed_statements():
+    """Collect the SQL statements executed against the test database."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", record)
+
+
 def override_get_db():
     """Override the database dependency for testing."""
     db = TestingSessionLocal()
@@ -59,7 +99,15 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Override the async database dependency for testing."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
 
 
 async def get_test_request():
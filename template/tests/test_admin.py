@@ -23,6 +23,21 @@ def test_moderator_dashboard_access(client, moderator_headers):
     assert response.status_code == status.HTTP_200_OK
 
 
+def test_metrics_admin(client, admin_headers):
+    """Test admin can read worker metrics."""
+    response = client.get("/admin/metrics", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert "counters" in data
+    assert "timers" in data
+
+
+def test_metrics_unauthorized(client, user_headers):
+    """Test regular user cannot read worker metrics."""
+    response = client.get("/admin/metrics", headers=user_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 def test_list_users_admin(client, admin_headers, regular_user):
     """Test admin can list users."""
     response = client.get("/admin/users", headers=admin_headers)
@@ -43,6 +58,103 @@ def test_list_users_unauthorized(client, user_headers):
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
+def add_users(db, count):
+    """Add ``count`` users named member00@example.com onwards."""
+    from datetime import datetime, timedelta
+    from app.models import User
+
+    for i in range(count):
+        db.add(
+            User(
+                email=f"member{i:02d}@example.com",
+                name=f"Member {i:02d}",
+                hashed_password="dummy",
+                role="user",
+                created_at=datetime(2025, 1, 1) + timedelta(minutes=i),
+            )
+        )
+    db.commit()
+
+
+def test_list_users_first_page_loads_more_on_scroll(client, admin_headers, db):
+    """Test the user list renders one page and a revealed trigger for the next."""
+    add_users(db, 30)
+
+    response = client.get("/admin/users?limit=10", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text.count('<tr class="border-t') == 10
+    assert 'hx-trigger="revealed"' in response.text
+
+
+def test_list_user_rows_pages_through_all_users(client, admin_headers, db):
+    """Test following the row fragments' next URLs visits every user once."""
+    import re
+
+    add_users(db, 25)
+
+    emails = []
+    url = "/admin/users/rows?sort=email&order=desc&limit=10"
+    while url:
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert "<html" not in response.text
+        emails += re.findall(r"(member\d+@example\.com)", response.text)
+        match = re.search(r'hx-get="([^"]+)" hx-trigger="revealed"', response.text)
+        url = match.group(1).replace("&amp;", "&") if match else None
+
+    assert emails == [f"member{i:02d}@example.com" for i in reversed(range(25))]
+
+
+def test_list_user_rows_prefix_search(client, admin_headers, db):
+    """Test searching matches email or name prefixes."""
+    add_users(db, 15)
+
+    response = client.get("/admin/users/rows?q=member1", headers=admin_headers)
+    assert response.text.count('<tr class="border-t') == 5
+
+    response = client.get("/admin/users/rows?q=Member 0", headers=admin_headers)
+    assert response.text.count('<tr class="border-t') == 10
+
+
+def test_list_user_rows_search_ignores_case(client, admin_headers, db):
+    """Test the prefix search matches regardless of case."""
+    add_users(db, 15)
+
+    response = client.get("/admin/users/rows?q=MEMBER1", headers=admin_headers)
+    assert response.text.count('<tr class="border-t') == 5
+
+    response = client.get("/admin/users/rows?q=member 0", headers=admin_headers)
+    assert response.text.count('<tr class="border-t') == 10
+
+
+def test_user_search_uses_lower_indexes(db):
+    """Test the prefix search is answered from the lower() indexes."""
+    from sqlalchemy import or_, select, text
+
+    from app.admin_routes import prefix_match
+    from app.models import User
+
+    stmt = select(User).where(
+        or_(prefix_match(User.email, "Member"), prefix_match(User.name, "Member"))
+    )
+    sql = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "USING INDEX ix_users_email_lower" in plan
+    assert "USING INDEX ix_users_name_lower" in plan
+
+
+def test_list_user_rows_rejects_unknown_sort(client, admin_headers):
+    """Test sorting is limited to indexed columns."""
+    response = client.get("/admin/users/rows?sort=name", headers=admin_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_list_user_rows_unauthorized(client, user_headers):
+    """Test regular user cannot load user rows."""
+    response = client.get("/admin/users/rows", headers=user_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 def test_create_user_admin(client, admin_headers, db):
     """Test admin can create new user."""
     headers = {**admin_headers, "Content-Type": "application/x-www-form-urlencoded"}
@@ -276,3 +388,175 @@ def test_delete_role_in_use(client, admin_headers, regular_user):
         headers=admin_headers,
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_rename_role_in_use(client, admin_headers, regular_user, db):
+    """Test a role assigned to users can be edited but not renamed."""
+    from app.models import Role
+
+    headers = {**admin_headers, "Content-Type": "application/x-www-form-urlencoded"}
+    response = client.put(
+        "/admin/roles/2",  # ID for 'user' role
+        headers=headers,
+        data={"name": "member", "description": "Renamed", "permissions": "{}"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Cannot rename role that is assigned to users"
+
+    response = client.put(
+        "/admin/roles/2",
+        headers=headers,
+        data={"name": "user", "description": "Regular users", "permissions": "{}"},
+    )
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+    db.expire_all()
+    assert db.get(Role, 2).description == "Regular users"
+
+
+def test_export_users_csv(client, admin_headers, regular_user):
+    """Test users export as CSV without password hashes."""
+    import csv
+    import io
+
+    response = client.get("/admin/users/export", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="users.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == ["admin@example.com", "user@example.com"]
+    assert "hashed_password" not in rows[0]
+
+
+def test_export_todos_ndjson_in_chunks(
+    client, admin_headers, regular_user, db, monkeypatch
+):
+    """Test todos stream as NDJSON across several fetch chunks."""
+    from datetime import datetime
+    from app import exports
+    from app.models import Todo
+
+    monkeypatch.setattr(exports, "EXPORT_CHUNK_SIZE", 2)
+    for i in range(5):
+        db.add(Todo(content=f"Todo {i}", user_id=regular_user.id, created_at=datetime.utcnow()))
+    db.commit()
+
+    response = client.get("/admin/todos/export?format=ndjson", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    todos = [json.loads(line) for line in response.text.splitlines()]
+    assert [todo["content"] for todo in todos] == [f"Todo {i}" for i in range(5)]
+    assert todos[0]["completed"] is False
+
+
+def test_export_unauthorized(client, user_headers):
+    """Test regular user cannot export data."""
+    for url in ["/admin/users/export", "/admin/todos/export"]:
+        response = client.get(url, headers=user_headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_import_users_csv(client, admin_headers, regular_user, db, monkeypatch):
+    """Test bulk import creates valid rows in batches and reports the rest."""
+    from app import auth, imports, stats
+
+    monkeypatch.setattr(imports, "IMPORT_BATCH_SIZE", 2)
+    csv_data = "\n".join(
+        [
+            "email,password,name,role,is_active",
+            "new1@example.com,password123,New One,,",
+            "new2@example.com,password123,New Two,moderator,false",
+            "user@example.com,password123,Existing,,",
+            "new1@example.com,password123,Duplicate,,",
+            "not-an-email,password123,,,",
+            "new3@example.com,short,,,",
+            "new4@example.com,password123,,nosuchrole,",
+            "new5@example.com,password123,,,",
+        ]
+    )
+    response = client.post(
+        "/admin/users/import",
+        headers=admin_headers,
+        files={"file": ("users.csv", csv_data, "text/csv")},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["created"] == 3
+    errors = [(e["line"], e["error"].split(":")[0]) for e in report["errors"]]
+    assert errors == [
+        (4, "Email already registered"),
+        (5, "Duplicate email in file"),
+        (6, "Invalid email"),
+        (7, "Invalid password"),
+        (8, "Invalid role"),
+    ]
+
+    user = auth.get_user_by_email(db, "new2@example.com")
+    assert auth.verify_password("password123", user.hashed_password)
+    assert user.role == "moderator"
+    assert user.is_active is False
+
+    counts = stats.read(db)
+    assert counts["users.total"] == 5
+    assert counts["users.inactive"] == 1
+
+
+def test_import_users_rejects_bad_encoding_before_writing(
+    client, admin_headers, db, monkeypatch
+):
+    """Test a file that stops being UTF-8 partway imports nothing."""
+    from app import auth, imports
+
+    monkeypatch.setattr(imports, "IMPORT_BATCH_SIZE", 1)
+    csv_data = (
+        b"email,password\n"
+        b"first@example.com,password123\n"
+        b"second@example.com,password123\n"
+        b"caf\xe9@example.com,password123\n"
+    )
+    response = client.post(
+        "/admin/users/import",
+        headers=admin_headers,
+        files={"file": ("users.csv", csv_data, "text/csv")},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert auth.get_user_by_email(db, "first@example.com") is None
+
+
+def test_import_users_without_upsert_support(client, admin_headers, regular_user, db, monkeypatch):
+    """Test the import inserts row by row on a database without ON CONFLICT."""
+    from app import auth, database, stats
+
+    monkeypatch.setattr(database, "UPSERT_INSERTS", {})
+    csv_data = "email,password\nnew1@example.com,password123\nuser@example.com,password123\n"
+    response = client.post(
+        "/admin/users/import",
+        headers=admin_headers,
+        files={"file": ("users.csv", csv_data, "text/csv")},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["created"] == 1
+    assert [e["error"] for e in report["errors"]] == ["Email already registered"]
+    assert auth.get_user_by_email(db, "new1@example.com") is not None
+    assert stats.read(db)["users.total"] == 3
+
+
+def test_import_users_missing_columns(client, admin_headers):
+    """Test an import without the required columns is rejected."""
+    response = client.post(
+        "/admin/users/import",
+        headers=admin_headers,
+        files={"file": ("users.csv", "email,name\na@example.com,A", "text/csv")},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_import_users_unauthorized(client, user_headers):
+    """Test users without manage_users cannot import."""
+    response = client.post(
+        "/admin/users/import",
+        headers=user_headers,
+        files={"file": ("users.csv", "email,password\n", "text/csv")},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
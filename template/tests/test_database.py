@@ -0,0 +1,38 @@
+from sqlalchemy import create_engine
+
+from app.database import (
+    configure_sqlite_engine,
+    get_active_sqlite_settings,
+    get_sqlite_pragmas,
+)
+
+
+def test_sqlite_profile_applied_on_connect(tmp_path):
+    """Test every connection gets the production SQLite settings."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    configure_sqlite_engine(engine)
+
+    settings = get_active_sqlite_settings(engine)
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["cache_size"] == -65536
+    assert settings["mmap_size"] == 268435456
+    assert settings["temp_store"] == 2  # MEMORY
+    assert settings["busy_timeout"] == 5000
+    assert settings["foreign_keys"] == 1
+    engine.dispose()
+
+
+def test_sqlite_profile_env_override(tmp_path, monkeypatch):
+    """Test SQLite settings can be overridden with environment variables."""
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "250")
+    assert get_sqlite_pragmas()["synchronous"] == "FULL"
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'override.db'}")
+    configure_sqlite_engine(engine)
+
+    settings = get_active_sqlite_settings(engine)
+    assert settings["synchronous"] == 2  # FULL
+    assert settings["busy_timeout"] == 250
+    engine.dispose()
@@ -0,0 +1,81 @@
+import pytest
+from fastapi import status
+
+from app import etags, templating
+
+PAGES = ["/login", "/register", "/settings"]
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_page_revalidates_with_304(client, path):
+    """Test a page answers a matching If-None-Match with an empty 304."""
+    response = client.get(path)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == etags.PAGE_CACHE_CONTROL
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert "HX-Request" in cached.headers["vary"]
+
+
+def test_compressed_etag_revalidates(client):
+    """Test the encoding-suffixed ETag of a compressed page still matches."""
+    response = client.get("/login", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["etag"].endswith('-gzip"')
+
+    cached = client.get(
+        "/login",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == response.headers["etag"]
+
+
+def test_etag_follows_theme_and_htmx_target(client):
+    """Test the theme and the HTMX partial each get their own ETag."""
+    etag = client.get("/login").headers["etag"]
+    assert client.get("/login", cookies={"theme": "nord"}).headers["etag"] != etag
+
+    partial = client.get("/login", headers={"HX-Request": "true", "HX-Target": "main-content"})
+    assert partial.headers["etag"] != etag
+    stale = client.get("/login", headers={"If-None-Match": partial.headers["etag"]})
+    assert stale.status_code == status.HTTP_200_OK
+
+
+def test_304_skips_rendering(client, monkeypatch):
+    """Test a revalidation is answered without rendering the template."""
+    etag = client.get("/settings").headers["etag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("template rendered")
+
+    monkeypatch.setattr(templating.templates, "TemplateResponse", fail)
+    response = client.get("/settings", headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_theme_api_revalidates(client):
+    """Test the theme API sends an ETag per theme and honours If-None-Match."""
+    response = client.get("/api/theme/nord")
+    etag = response.headers["etag"]
+    assert client.get("/api/theme/light").headers["etag"] != etag
+
+    cached = client.get("/api/theme/nord", headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+
+
+def test_build_version_follows_templates(monkeypatch, tmp_path):
+    """Test editing a template changes the version while templates auto-reload."""
+    monkeypatch.setattr(templating, "TEMPLATE_DIR", tmp_path)
+    monkeypatch.setattr(templating.templates.env, "auto_reload", True)
+    (tmp_path / "page.html").write_text("one")
+    version = etags.build_version()
+
+    (tmp_path / "page.html").write_text("two!")
+    assert etags.build_version() != version
+
+    monkeypatch.setattr(etags, "APP_BUILD_ID", "build-42")
+    assert etags.build_version() == "build-42"
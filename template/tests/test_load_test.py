@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from app.models import Base
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_load_test_runs_journeys_in_process(tmp_path):
+    """Test the load generator drives every journey and reports each route."""
+    # A fresh schema; the app's lifespan seeds the admin user and roles
+    database_url = f"sqlite:///{tmp_path / 'load.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    env = {
+        **os.environ,
+        "BOOTSTRAP_LOCK_FILE": str(tmp_path / ".bootstrap.lock"),
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "scripts/load_test.py",
+            "--database", database_url,
+            "--users", "2",
+            "--admins", "1",
+            "--concurrency", "2",
+            "--todos", "3",
+            "--json",
+        ],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+
+    routes = report["routes"]
+    assert routes["POST /todos"]["requests"] == 6
+    assert routes["POST /todos/{id}/toggle"]["requests"] == 6
+    assert routes["DELETE /todos/{id}"]["requests"] == 6
+    assert routes["POST /login"]["requests"] == 3
+    assert routes["GET /admin/roles"]["requests"] == 1
+    assert report["total"]["errors"] == 0
+    for stats in routes.values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["rps"] > 0
+
+
+def test_load_test_refuses_the_default_database():
+    """Test an in-process run needs a database other than data/app.db."""
+    cases = [
+        ([], "need --database"),
+        (["--database", "sqlite:///./data/app.db"], "refusing"),
+    ]
+    for database_args, message in cases:
+        result = subprocess.run(
+            [sys.executable, "scripts/load_test.py", *database_args],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 2
+        assert message in result.stderr
@@ -0,0 +1,137 @@
+import asyncio
+import zlib
+
+from fastapi import status
+from starlette.datastructures import Headers
+
+from app import metrics
+from app.middleware import AuthCookieMiddleware, CompressionMiddleware, get_cookie
+
+
+def test_get_cookie():
+    """Test reading a single cookie from a raw Cookie header."""
+    header = b"theme=light; access_token=abc.def.ghi; other=1"
+    assert get_cookie(header, b"access_token") == b"abc.def.ghi"
+    assert get_cookie(header, b"missing") is None
+
+
+def test_cookie_authenticates_protected_route(client, user_headers):
+    """Test the access_token cookie is accepted in place of an Authorization header."""
+    client.cookies.set("access_token", user_headers["Authorization"].split(" ")[1])
+    response = client.get("/profile")
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_middleware_passes_streamed_body_through():
+    """Test response body chunks are forwarded as they are sent, not buffered."""
+    seen_headers = []
+
+    async def streaming_app(scope, receive, send):
+        seen_headers.extend(scope["headers"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for chunk in (b"one", b"two", b"three"):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "headers": [(b"cookie", b"access_token=token123")],
+    }
+    asyncio.run(AuthCookieMiddleware(streaming_app)(scope, receive, send))
+
+    bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+    assert bodies == [b"one", b"two", b"three", b""]
+    assert (b"authorization", b"Bearer token123") in seen_headers
+    # The caller's scope is not modified
+    assert scope["headers"] == [(b"cookie", b"access_token=token123")]
+
+
+def run_app(app, headers):
+    """Drive ``app`` through the ASGI interface and return the sent messages."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_compression_gzips_large_text_responses(client):
+    """Test pages over the size threshold are gzipped and small ones are not."""
+    metrics.reset()
+    response = client.get("/login", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert "<html" in response.text
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["compression.gzip"] == 1
+    assert counters["compression.bytes_out"] < counters["compression.bytes_in"]
+    assert 0 < metrics.snapshot()["ratios"]["compression.ratio"] < 1
+    assert metrics.snapshot()["timers"]["compression.cpu"]["count"] == 1
+
+    small = client.get("/themes/000000000000.css", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    plain = client.get("/login", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == response.text
+
+
+def test_compression_streams_chunks():
+    """Test streamed bodies are compressed and flushed chunk by chunk."""
+    chunks = [b"row,%d\n" % i * 100 for i in range(3)]
+
+    async def streaming_app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/csv")],
+        })
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = run_app(CompressionMiddleware(streaming_app), [(b"accept-encoding", b"gzip")])
+
+    start = Headers(raw=messages[0]["headers"])
+    assert start["content-encoding"] == "gzip"
+    assert "content-length" not in start
+    bodies = [m["body"] for m in messages[1:]]
+    assert len(bodies) == 4 and all(bodies)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Every chunk can be decoded as soon as it arrives
+    for chunk, body in zip(chunks, bodies):
+        assert decompressor.decompress(body) == chunk
+    assert decompressor.decompress(bodies[-1]) == b"" and decompressor.eof
+
+
+def test_compression_skips_encoded_and_binary_responses():
+    """Test precompressed and non-text responses are passed through as is."""
+    for headers in [
+        [(b"content-type", b"text/css"), (b"content-encoding", b"br")],
+        [(b"content-type", b"font/woff2")],
+    ]:
+        async def app(scope, receive, send, headers=headers):
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"x" * 2000})
+
+        messages = run_app(CompressionMiddleware(app), [(b"accept-encoding", b"gzip, br")])
+        assert messages[0]["headers"] == headers
+        assert messages[1]["body"] == b"x" * 2000
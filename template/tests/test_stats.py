@@ -0,0 +1,91 @@
+from fastapi import status
+
+from app import stats
+from app.models import Stat
+
+
+def nonzero(counts):
+    """Drop zero counters, which may or may not have a stored row."""
+    return {name: value for name, value in counts.items() if value}
+
+
+def test_counters_follow_fixture_users(db, admin_user, regular_user, inactive_user):
+    """Test ORM inserts update the counters in the same transaction."""
+    counts = stats.read(db)
+    assert counts["users.total"] == 3
+    assert counts["users.active"] == 2
+    assert counts["users.inactive"] == 1
+    assert counts["users.role.admin"] == 1
+    assert counts["users.role.user"] == 2
+    assert nonzero(counts) == nonzero(stats.compute(db))
+
+
+def test_counters_follow_user_updates(client, db, admin_headers, regular_user):
+    """Test deactivating a user and changing their role moves the counters."""
+    response = client.put(
+        f"/admin/users/{regular_user.id}",
+        headers=admin_headers,
+        data={
+            "email": regular_user.email,
+            "name": "Updated",
+            "role": "moderator",
+            "is_active": "false",
+        },
+    )
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    counts = stats.read(db)
+    assert counts["users.inactive"] == 1
+    assert counts["users.role.user"] == 0
+    assert counts["users.role.moderator"] == 1
+    assert nonzero(counts) == nonzero(stats.compute(db))
+
+
+def test_counters_follow_todos(client, db, user_headers):
+    """Test creating, completing and deleting todos keeps the counters exact."""
+    client.post("/todos", headers=user_headers, data={"content": "One"})
+    client.post("/todos", headers=user_headers, data={"content": "Two"})
+    client.post("/todos/1/toggle", headers=user_headers)
+
+    counts = stats.read(db)
+    assert (counts["todos.open"], counts["todos.completed"]) == (1, 1)
+
+    client.delete("/todos/1", headers=user_headers)
+    client.delete("/todos/2", headers=user_headers)
+
+    counts = stats.read(db)
+    assert (counts["todos.open"], counts["todos.completed"]) == (0, 0)
+
+
+def test_reconcile_repairs_drift(db, regular_user):
+    """Test reconcile rewrites counters that no longer match the tables."""
+    db.get(Stat, "users.total").value = 42
+    db.commit()
+
+    assert stats.reconcile(db) == {"users.total": (42, 1)}
+    assert stats.read(db)["users.total"] == 1
+    assert stats.reconcile(db) == {}
+
+
+def test_dashboard_reads_counters(
+    client, admin_headers, regular_user, executed_statements
+):
+    """Test the dashboard shows counters without counting table rows."""
+    response = client.get("/admin/dashboard", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert "2 active · 0 inactive" in response.text
+    assert not [s for s in executed_statements if "count(" in s.lower()]
+
+
+def test_counters_without_upsert_support(client, db, user_headers, monkeypatch):
+    """Test the counters stay exact on a database without ON CONFLICT inserts."""
+    from app import database
+
+    monkeypatch.setattr(database, "UPSERT_INSERTS", {})
+    client.post("/todos", headers=user_headers, data={"content": "One"})
+    client.post("/todos", headers=user_headers, data={"content": "Two"})
+    client.post("/todos/1/toggle", headers=user_headers)
+
+    counts = stats.read(db)
+    assert (counts["todos.open"], counts["todos.completed"]) == (1, 1)
+    assert nonzero(counts) == nonzero(stats.compute(db))
@@ -188,3 +188,143 @@ def test_token_endpoint_invalid_credentials(client, regular_user):
         },
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_records_hashing_metrics(client, regular_user, test_password):
+    """Test password verification runs in the hashing pool and is measured."""
+    from app import metrics
+
+    metrics.reset()
+    response = client.post(
+        "/login",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        data={"email": regular_user.email, "password": test_password},
+    )
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+    timers = metrics.snapshot()["timers"]
+    assert timers["password_hash.wait"]["count"] == 1
+    assert timers["password_hash.run"]["count"] == 1
+
+
+def test_login_rejected_when_hashing_pool_full(
+    client, regular_user, test_password, monkeypatch
+):
+    """Test login fails fast with 503 when the hashing queue is full."""
+    from app import hashing
+
+    monkeypatch.setattr(hashing, "HASH_QUEUE_LIMIT", 0)
+    response = client.post(
+        "/login",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        data={"email": regular_user.email, "password": test_password},
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "1"
+
+
+def test_token_cache_reuses_verified_claims(client, user_token, user_headers):
+    """Test repeat requests with the same token are served from the token cache."""
+    from app import auth, metrics
+
+    auth.token_cache.clear()
+    metrics.reset()
+    client.get("/profile", headers=user_headers)
+    client.get("/profile", headers=user_headers)
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["jwt_cache.misses"] == 1
+    assert counters["jwt_cache.hits"] == 1
+    assert metrics.snapshot()["ratios"]["jwt_cache.hit_rate"] == 0.5
+
+
+def test_token_cache_entry_expires_with_token(regular_user):
+    """Test cached claims never outlive the token's exp claim."""
+    import time
+    from datetime import timedelta
+    from app import auth
+
+    auth.token_cache.clear()
+    token = auth.create_access_token(
+        data={"sub": regular_user.email}, expires_delta=timedelta(seconds=1)
+    )
+    assert auth.decode_access_token(token)["sub"] == regular_user.email
+    time.sleep(1.1)
+    assert auth.token_cache.get(token) is None
+
+
+def test_principal_resolved_once_per_request(
+    client, moderator_headers, executed_statements
+):
+    """Test a guarded admin page loads the user with a single query."""
+    response = client.get("/admin/users", headers=moderator_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    user_lookups = [
+        s for s in executed_statements if "FROM users" in s and "users.email = ?" in s
+    ]
+    role_lookups = [s for s in executed_statements if s.lstrip().startswith("SELECT roles.")]
+    assert len(user_lookups) == 1
+    assert role_lookups == []
+
+
+def test_user_cache_skips_user_query(client, user_headers, executed_statements):
+    """Test repeat authenticated requests are served from the user cache."""
+    client.get("/profile", headers=user_headers)
+    client.get("/profile", headers=user_headers)
+
+    user_lookups = [s for s in executed_statements if "users.email = ?" in s]
+    assert len(user_lookups) == 1
+
+
+def test_user_cache_invalidated_by_admin_update(
+    client, admin_headers, user_headers, regular_user
+):
+    """Test deactivating a user takes effect despite a cached snapshot."""
+    assert client.get("/todos", headers=user_headers).status_code == status.HTTP_200_OK
+
+    response = client.put(
+        f"/admin/users/{regular_user.id}",
+        headers=admin_headers,
+        data={
+            "email": regular_user.email,
+            "name": "Deactivated",
+            "role": "user",
+            "is_active": "false",
+        },
+    )
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    response = client.get("/todos", headers=user_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_cancelled_hash_releases_its_slot(monkeypatch):
+    """Test a hash whose caller is cancelled (client disconnect) frees its queue slot."""
+    import asyncio
+    import threading
+
+    from app import hashing
+
+    monkeypatch.setattr(hashing, "HASH_QUEUE_LIMIT", 1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+        return "hashed"
+
+    async def scenario():
+        task = asyncio.ensure_future(hashing.run(slow_hash))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0)
+        # The job is still running, so its slot is still taken
+        assert hashing.pending_jobs() == 1
+        release.set()
+        while hashing.pending_jobs():
+            await asyncio.sleep(0.01)
+        return await hashing.run(lambda: "next")
+
+    assert asyncio.run(scenario()) == "next"
+    assert hashing.pending_jobs() == 0
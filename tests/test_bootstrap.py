@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import bootstrap, database, models, roles
+from app.main import app
+
+
+@pytest.fixture
+def session_factory(db):
+    return sessionmaker(bind=db.get_bind())
+
+
+@pytest.fixture
+def empty_session_factory(tmp_path):
+    """Sessions on a new database with the schema only (no roles)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    # Enforces foreign keys, so users.role needs its role to exist first
+    database.configure_sqlite_engine(engine)
+    models.Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def lock_path(tmp_path):
+    return str(tmp_path / "bootstrap.lock")
+
+
+def test_run_bootstraps_empty_database(empty_session_factory, lock_path):
+    """Test the first run seeds the admin user, default roles and counters."""
+    with empty_session_factory() as db:
+        assert not bootstrap.is_bootstrapped(db)
+        assert db.query(models.Role).count() == 0
+
+    assert bootstrap.run(empty_session_factory, lock_path) is True
+
+    with empty_session_factory() as db:
+        assert bootstrap.is_bootstrapped(db)
+        assert db.query(models.User).filter(models.User.role == "admin").count() == 1
+        assert {role.name for role in db.query(models.Role)} >= set(roles.DEFAULT_ROLES)
+
+
+def test_run_skips_bootstrapped_database(session_factory, lock_path, monkeypatch):
+    """Test later runs only check, without writing or hashing a password."""
+    bootstrap.run(session_factory, lock_path)
+
+    def fail(db):
+        raise AssertionError("bootstrapped twice")
+
+    monkeypatch.setattr(bootstrap, "bootstrap", fail)
+    assert bootstrap.run(session_factory, lock_path) is False
+
+
+def test_lifespan_runs_bootstrap(monkeypatch):
+    """Test the bootstrap runs when the app starts, not when it is imported."""
+    calls = []
+    monkeypatch.setattr(bootstrap, "run", lambda: calls.append(True))
+    monkeypatch.setattr(bootstrap, "BOOTSTRAP_ON_STARTUP", True)
+    # Keep the app's own database untouched
+    monkeypatch.setattr(database, "log_sqlite_settings", lambda engine: None)
+    assert calls == []
+
+    with TestClient(app):
+        assert calls == [True]
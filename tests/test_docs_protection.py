@@ -1,5 +1,7 @@
 from fastapi import status
 
+from app import auth
+
 
 def test_docs_route_no_auth(client):
     """Test accessing /docs route without authentication."""
@@ -71,3 +73,14 @@ def test_openapi_route_admin_user(client, admin_headers):
     client.cookies.set("access_token", admin_headers["Authorization"].split(" ")[1])
     response = client.get("/openapi.json")
     assert response.status_code == status.HTTP_200_OK
+
+
+def test_docs_route_lookup_error(client, admin_headers, monkeypatch):
+    """Test an error while checking the principal denies access instead of failing."""
+    def fail(request, db):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(auth, "resolve_principal", fail)
+    client.cookies.set("access_token", admin_headers["Authorization"].split(" ")[1])
+    response = client.get("/docs")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
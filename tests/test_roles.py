@@ -227,3 +227,69 @@ def test_invalid_role_permissions(db):
 def test_nonexistent_permission(admin_user):
     """Test checking for a permission that doesn't exist."""
     assert has_permission(admin_user, "nonexistent_permission") is False
+
+
+def test_role_update_invalidates_cached_permissions(
+    client, admin_headers, moderator_headers
+):
+    """Test changing a role's permissions applies to users already cached."""
+    assert (
+        client.get("/admin/users", headers=moderator_headers).status_code
+        == status.HTTP_200_OK
+    )
+
+    response = client.put(
+        "/admin/roles/3",  # ID for 'moderator' role
+        headers=admin_headers,
+        data={
+            "name": "moderator",
+            "description": "No user access",
+            "permissions": json.dumps({"view_users": False}),
+        },
+    )
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    response = client.get("/admin/users", headers=moderator_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_role_catalog_lists_default_roles(db):
+    """Test the role catalog holds parsed permission sets for every role."""
+    from app.roles import role_catalog
+
+    assert "moderator" in role_catalog
+    assert role_catalog.permissions("moderator") == {
+        "view_users",
+        "manage_users",
+        "view_roles",
+        "view_system",
+    }
+    assert role_catalog.permissions("missing") == frozenset()
+
+
+def test_permission_checks_do_not_query_roles(
+    client, moderator_headers, executed_statements
+):
+    """Test guarded pages and user forms are served without reading the roles table."""
+    for endpoint in ["/admin/users", "/admin/users/new"]:
+        response = client.get(endpoint, headers=moderator_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+    assert not [s for s in executed_statements if "FROM roles" in s]
+
+
+def test_role_catalog_rebuilt_on_create(client, admin_headers):
+    """Test a newly created role is available without a restart."""
+    from app.roles import role_catalog
+
+    response = client.post(
+        "/admin/roles",
+        headers=admin_headers,
+        data={
+            "name": "auditor",
+            "description": "Read-only access",
+            "permissions": json.dumps({"view_users": True, "view_roles": False}),
+        },
+    )
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+    assert role_catalog.permissions("auditor") == {"view_users"}
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Several times a typical cold start (about 1 s to the first response), so
+# only a real regression fails on a slow CI machine. Set
+# STARTUP_IMPORT_BUDGET_MS / STARTUP_FIRST_RESPONSE_BUDGET_MS to tighten them.
+IMPORT_BUDGET_MS = os.getenv("STARTUP_IMPORT_BUDGET_MS", "5000")
+FIRST_RESPONSE_BUDGET_MS = os.getenv("STARTUP_FIRST_RESPONSE_BUDGET_MS", "6000")
+
+
+def measure_startup(tmp_path):
+    """Run scripts/startup_budget.py once and return its report and exit status."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}",
+        "BOOTSTRAP_ON_STARTUP": "false",
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "scripts/startup_budget.py",
+            "--runs", "1",
+            "--import-budget-ms", IMPORT_BUDGET_MS,
+            "--first-response-budget-ms", FIRST_RESPONSE_BUDGET_MS,
+            "--json",
+        ],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout), result.returncode
+
+
+def test_startup_keeps_lazy_modules_lazy(tmp_path):
+    """Test a cold start serves the first page without importing lazy modules."""
+    report, _ = measure_startup(tmp_path)
+
+    assert report["status"] == 200
+    assert report["eager_lazy_modules"] == []
+
+
+def test_startup_within_budget(tmp_path):
+    """Test a cold start stays within the import-time and first-response budgets."""
+    report, returncode = measure_startup(tmp_path)
+
+    assert report["over_budget"] == [], report
+    assert returncode == 0
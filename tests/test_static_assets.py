@@ -0,0 +1,104 @@
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app import static_assets
+
+CSS = "body { background: url('../fonts/icon.woff2?v=1') } " + "a { color: red } " * 50
+
+
+def build_static(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "fonts").mkdir()
+    (tmp_path / "css" / "site.css").write_text(CSS)
+    (tmp_path / "fonts" / "icon.woff2").write_bytes(b"font")
+    return static_assets.build(tmp_path)
+
+
+def test_build_writes_hashed_files_and_manifest(tmp_path):
+    """Test files get content-hashed copies, a manifest and compressed variants."""
+    manifest = build_static(tmp_path)
+
+    assert set(manifest) == {"css/site.css", "fonts/icon.woff2"}
+    assert static_assets.HASHED_NAME.search(manifest["css/site.css"])
+    assert json.loads((tmp_path / "dist" / "manifest.json").read_text()) == manifest
+
+    css = tmp_path / manifest["css/site.css"]
+    assert gzip.decompress(css.with_name(css.name + ".gz").read_bytes()) == css.read_bytes()
+    # Too small to be worth compressing
+    font = tmp_path / manifest["fonts/icon.woff2"]
+    assert not font.with_name(font.name + ".gz").exists()
+
+
+def test_build_rewrites_css_urls(tmp_path):
+    """Test stylesheets reference the hashed copies of their fonts."""
+    manifest = build_static(tmp_path)
+    css = (tmp_path / manifest["css/site.css"]).read_text()
+    font_name = manifest["fonts/icon.woff2"].rsplit("/", 1)[1]
+
+    assert f"url('../fonts/{font_name}?v=1')" in css
+
+
+def test_choose_encoding():
+    """Test the preferred available coding the client accepts is picked."""
+    available = {"br", "gzip"}
+    assert static_assets.choose_encoding("gzip, deflate, br", available) == "br"
+    assert static_assets.choose_encoding("gzip, br;q=0", available) == "gzip"
+    assert static_assets.choose_encoding("gzip", {"br"}) is None
+    assert static_assets.choose_encoding(None, available) is None
+
+
+def test_static_assets_serve_precompressed_variants(tmp_path):
+    """Test hashed files are served precompressed and cached as immutable."""
+    manifest = build_static(tmp_path)
+    app = Starlette(routes=[Mount("/static", static_assets.StaticAssets(directory=tmp_path))])
+    client = TestClient(app)
+    url = f"/static/{manifest['css/site.css']}"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == static_assets.IMMUTABLE
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text.startswith("body {")
+
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == response.text
+
+    revalidated = client.get(
+        url, headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_unhashed_files_are_revalidated(tmp_path):
+    """Test files without a content hash in their name are not cached for good."""
+    build_static(tmp_path)
+    app = Starlette(routes=[Mount("/static", static_assets.StaticAssets(directory=tmp_path))])
+
+    response = TestClient(app).get("/static/css/site.css")
+    assert response.headers["cache-control"] == static_assets.REVALIDATE
+    assert "content-encoding" not in response.headers
+
+
+def test_static_url_uses_manifest(monkeypatch):
+    """Test static_url resolves hashed names and falls back to the plain path."""
+    monkeypatch.setattr(
+        static_assets, "load_manifest", lambda: {"css/theme.css": "dist/css/theme.0123456789ab.css"}
+    )
+    assert static_assets.static_url("css/theme.css") == "/static/dist/css/theme.0123456789ab.css"
+    assert static_assets.static_url("/css/other.css") == "/static/css/other.css"
+
+
+def test_missing_build_outputs(tmp_path):
+    """Test the outputs of scripts/build_assets.py that do not exist are reported."""
+    assert static_assets.missing_build_outputs(tmp_path) == list(static_assets.BUILD_OUTPUTS)
+
+    for path in static_assets.BUILD_OUTPUTS:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    assert static_assets.missing_build_outputs(tmp_path) == []
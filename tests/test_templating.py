@@ -0,0 +1,101 @@
+import re
+
+from app import auth_routes, main, static_assets, templating
+
+
+def test_routers_share_one_environment():
+    """Test every router renders through the same Jinja2 environment."""
+    assert auth_routes.templates is templating.templates
+    assert main.templates is templating.templates
+    assert main.app.state.templates is templating.templates
+    assert "fromjson" in templating.templates.env.filters
+
+
+def test_auto_reload_follows_environment(monkeypatch, tmp_path):
+    """Test template files are only re-checked outside production."""
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    assert templating.create_environment(bytecode_cache_dir=str(tmp_path)).auto_reload is False
+
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    assert templating.create_environment(bytecode_cache_dir=str(tmp_path)).auto_reload is True
+
+
+def test_warm_up_fills_bytecode_cache(tmp_path):
+    """Test warm-up compiles every template and persists its bytecode."""
+    from fastapi.templating import Jinja2Templates
+
+    templates = Jinja2Templates(
+        env=templating.create_environment(bytecode_cache_dir=str(tmp_path))
+    )
+    count = templating.warm_up(templates)
+
+    assert count == len(templates.env.list_templates()) > 0
+    assert len(list(tmp_path.glob("__jinja2_*.cache"))) == count
+
+
+def test_warm_up_enabled_defaults_to_production(monkeypatch):
+    """Test warm-up runs by default only in production."""
+    monkeypatch.delenv("TEMPLATE_WARMUP", raising=False)
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    assert templating.warm_up_enabled() is True
+
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    assert templating.warm_up_enabled() is False
+
+    monkeypatch.setenv("TEMPLATE_WARMUP", "true")
+    assert templating.warm_up_enabled() is True
+
+
+HTMX_NAVIGATION = {"HX-Request": "true", "HX-Target": "main-content"}
+
+
+def test_htmx_navigation_renders_content_block(client, admin_headers):
+    """Test HTMX navigations into the content area get only the content block."""
+    full = client.get("/admin/users", headers=admin_headers)
+    partial = client.get("/admin/users", headers={**admin_headers, **HTMX_NAVIGATION})
+
+    assert partial.status_code == 200
+    assert "<html" in full.text
+    assert "<html" not in partial.text
+    assert "<nav" not in partial.text
+    assert "Manage Users" in partial.text
+    assert len(partial.content) < len(full.content)
+    for response in (full, partial):
+        assert "HX-Request" in response.headers["vary"]
+        assert "HX-Target" in response.headers["vary"]
+
+
+def test_htmx_partial_only_for_known_targets(client):
+    """Test other HTMX targets and history restores still get the full page."""
+    for headers in [
+        {"HX-Request": "true", "HX-Target": "edit-modal"},
+        {**HTMX_NAVIGATION, "HX-History-Restore-Request": "true"},
+    ]:
+        response = client.get("/settings", headers=headers)
+        assert "<html" in response.text
+
+
+def asset_urls(client):
+    response = client.get("/login")
+    return re.findall(r'<(?:script|link)[^>]+(?:src|href)="([^"]+)"', response.text)
+
+
+def test_pages_load_only_local_assets(client, monkeypatch):
+    """Test the layout loads scripts and stylesheets from the app once they are built."""
+    monkeypatch.setattr(
+        static_assets, "built_outputs", lambda: frozenset(static_assets.BUILD_OUTPUTS)
+    )
+    urls = asset_urls(client)
+
+    assert "/static/css/tailwind.css" in urls
+    assert all(url.startswith("/") for url in urls), urls
+
+
+def test_pages_fall_back_to_cdns_until_built(client, monkeypatch):
+    """Test assets that have not been built are loaded from their CDNs."""
+    monkeypatch.setattr(static_assets, "built_outputs", lambda: frozenset())
+    urls = asset_urls(client)
+
+    assert set(static_assets.CDN_URLS.values()) <= set(urls)
+    assert "https://cdn.tailwindcss.com" in urls
+    assert "/static/css/tailwind.css" not in urls
@@ -0,0 +1,43 @@
+import re
+
+from app import themes
+
+
+def test_stylesheet_has_a_block_per_theme():
+    """Test every theme compiles to a data-theme block, default first."""
+    css = themes.build_stylesheet().css
+
+    assert css.startswith(f':root, [data-theme="{themes.DEFAULT_THEME}"] {{')
+    for name in themes.THEMES:
+        assert f'[data-theme="{name}"]' in css
+    assert f"--theme-accent_hover: {themes.THEMES['nord'].accent_hover};" in css
+
+
+def test_stylesheet_digest_follows_content():
+    """Test the digest changes only when the theme colors change."""
+    stylesheet = themes.build_stylesheet()
+    assert themes.build_stylesheet().digest == stylesheet.digest
+
+    changed = dict(themes.THEMES, light=themes.ThemeColors(
+        **{**vars(themes.THEMES["light"]), "accent": "#000000"}
+    ))
+    assert themes.build_stylesheet(changed).digest != stylesheet.digest
+
+
+def test_pages_link_hashed_stylesheet(client):
+    """Test pages link the theme stylesheet, which is served immutable."""
+    response = client.get("/settings", cookies={"theme": "nord"})
+    assert 'data-theme="nord"' in response.text
+    assert "/api/theme/" not in response.text
+
+    url = re.search(r'href="(/themes/[0-9a-f]+\.css)"', response.text).group(1)
+    stylesheet = client.get(url)
+    assert stylesheet.status_code == 200
+    assert stylesheet.headers["content-type"].startswith("text/css")
+    assert "immutable" in stylesheet.headers["cache-control"]
+    assert '[data-theme="nord"]' in stylesheet.text
+
+
+def test_stale_stylesheet_digest_not_found(client):
+    """Test a digest from an older build is not served."""
+    assert client.get("/themes/000000000000.css").status_code == 404
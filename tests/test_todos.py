@@ -0,0 +1,196 @@
+from fastapi import status
+from sqlalchemy import select, text
+
+from app import models
+
+
+def test_create_todo(client, user_headers):
+    """Test creating a todo returns its HTML fragment."""
+    response = client.post("/todos", headers=user_headers, data={"content": "Buy milk"})
+    assert response.status_code == status.HTTP_200_OK
+    assert "Buy milk" in response.text
+    assert 'hx-post="/todos/1/toggle"' in response.text
+
+
+def test_list_todos(client, user_headers):
+    """Test listing returns only the current user's todos."""
+    client.post("/todos", headers=user_headers, data={"content": "First"})
+    client.post("/todos", headers=user_headers, data={"content": "Second"})
+
+    response = client.get("/todos", headers=user_headers)
+    assert response.status_code == status.HTTP_200_OK
+    contents = [todo["content"] for todo in response.json()["todos"]]
+    assert sorted(contents) == ["First", "Second"]
+
+
+def test_list_todos_unauthenticated(client):
+    """Test listing todos requires authentication."""
+    response = client.get("/todos")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_toggle_todo(client, user_headers):
+    """Test toggling marks a todo as completed and back."""
+    client.post("/todos", headers=user_headers, data={"content": "Toggle me"})
+
+    response = client.post("/todos/1/toggle", headers=user_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert "checked" in response.text
+    assert "line-through" in response.text
+
+    response = client.post("/todos/1/toggle", headers=user_headers)
+    assert "line-through" not in response.text
+
+
+def test_delete_todo(client, user_headers):
+    """Test deleting a todo removes it."""
+    client.post("/todos", headers=user_headers, data={"content": "Delete me"})
+
+    response = client.delete("/todos/1", headers=user_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/todos", headers=user_headers).json()["todos"] == []
+
+
+def test_cannot_toggle_other_users_todo(client, user_headers, moderator_headers):
+    """Test a user cannot modify another user's todo."""
+    client.post("/todos", headers=user_headers, data={"content": "Mine"})
+
+    client.post("/todos/1/toggle", headers=moderator_headers)
+    todos = client.get("/todos", headers=user_headers).json()["todos"]
+    assert todos[0]["completed"] is False
+
+
+def query_plan(db, stmt):
+    """Return the SQLite query plan details for a statement."""
+    sql = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return " ".join(row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_user_todos_query_uses_composite_index(db):
+    """Test listing a user's todos newest first reads the composite index."""
+    stmt = (
+        select(models.Todo)
+        .where(models.Todo.user_id == 1)
+        .order_by(models.Todo.created_at.desc())
+    )
+    plan = query_plan(db, stmt)
+    assert "USING INDEX ix_todos_user_id_created_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def add_todos(db, user, count):
+    """Add ``count`` todos for ``user``, each one second newer than the last."""
+    from datetime import datetime, timedelta
+
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        db.add(
+            models.Todo(
+                content=f"Todo {i}",
+                user_id=user.id,
+                created_at=start + timedelta(seconds=i),
+            )
+        )
+    db.commit()
+
+
+def test_list_todos_pages_with_cursors(client, db, regular_user, user_headers):
+    """Test walking forwards and backwards through pages of todos."""
+    add_todos(db, regular_user, 5)
+
+    page = client.get("/todos?limit=2", headers=user_headers).json()
+    assert [t["content"] for t in page["todos"]] == ["Todo 4", "Todo 3"]
+    assert page["prev_cursor"] is None
+
+    page = client.get(
+        f"/todos?limit=2&after={page['next_cursor']}", headers=user_headers
+    ).json()
+    assert [t["content"] for t in page["todos"]] == ["Todo 2", "Todo 1"]
+
+    last = client.get(
+        f"/todos?limit=2&after={page['next_cursor']}", headers=user_headers
+    ).json()
+    assert [t["content"] for t in last["todos"]] == ["Todo 0"]
+    assert last["next_cursor"] is None
+
+    back = client.get(
+        f"/todos?limit=2&before={page['prev_cursor']}", headers=user_headers
+    ).json()
+    assert [t["content"] for t in back["todos"]] == ["Todo 4", "Todo 3"]
+    assert back["prev_cursor"] is None
+
+
+def test_list_todos_rejects_bad_cursor(client, user_headers):
+    """Test malformed cursors and conflicting parameters are rejected."""
+    response = client.get("/todos?after=not-a-cursor", headers=user_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.get("/todos?after=a&before=b", headers=user_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.get("/todos?limit=1000", headers=user_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_list_rejects_cursor_values_of_the_wrong_type(client, user_headers, admin_headers):
+    """Test cursors whose values don't match the sort key columns are rejected."""
+    from app.pagination import encode_cursor
+
+    for values in ([{"a": 1}, 1], [["2024-01-01"], 1], ["2024-01-01T00:00:00", "1"], [1, True]):
+        response = client.get(f"/todos?after={encode_cursor(values)}", headers=user_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
+
+    for values in ([{"a": 1}], ["1"]):
+        response = client.get(
+            f"/admin/users/rows?after={encode_cursor(values)}", headers=admin_headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_todo_page_query_seeks_index(db):
+    """Test a cursor page is an index range scan, not a scan and sort."""
+    from datetime import datetime
+    from sqlalchemy import tuple_
+
+    key = tuple_(models.Todo.created_at, models.Todo.id)
+    stmt = (
+        select(models.Todo)
+        .where(models.Todo.user_id == 1, key < (datetime(2025, 1, 1), 10))
+        .order_by(models.Todo.created_at.desc(), models.Todo.id.desc())
+        .limit(21)
+    )
+    plan = query_plan(db, stmt)
+    assert "ix_todos_user_id_created_at (user_id=? AND created_at<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_todo_content_is_escaped(client, user_headers):
+    """Test todo content cannot inject markup into the fragment."""
+    response = client.post(
+        "/todos", headers=user_headers, data={"content": "<script>alert(1)</script>"}
+    )
+    assert "<script>" not in response.text
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in response.text
+
+
+def test_page_and_fragment_share_todo_markup(client, user_headers):
+    """Test the home page list and the HTMX endpoints render identical rows."""
+    fragment = client.post("/todos", headers=user_headers, data={"content": "Same"}).text
+
+    page = client.get("/", headers=user_headers).text
+    assert fragment in page
+
+
+def test_bulk_render_matches_single_rows():
+    """Test the list renderer produces the same rows as rendering one by one."""
+    from datetime import datetime
+    from app.todo_routes import render_todo_item, render_todo_list
+
+    todos = [
+        models.Todo(id=i, content=f"Todo {i}", completed=i % 2 == 0, created_at=datetime.utcnow())
+        for i in range(3)
+    ]
+    bulk = render_todo_list(todos)
+    for todo in todos:
+        assert render_todo_item(todo) in bulk